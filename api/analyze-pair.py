@@ -5,31 +5,49 @@ Place in: /api/analyze-pair.py
 This is a Vercel serverless function that analyzes a single trading pair
 """
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
-import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add utils directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from database import get_db
+from serialization import dumps, loads, clean_nan_values
+from compression import compress_body
+from responses import header_block, send_header_block
 from fetchers import DataFetcher
-from technical import TechnicalAnalyzer, SignalGenerator
+from technical import SignalGenerator, compute_technical_data, insufficient_data_analysis
+from constants import PAIR_TYPE, VALID_SYMBOLS
 
 
-def clean_nan_from_dict(obj):
-    """Recursively clean NaN values from dictionaries"""
-    if isinstance(obj, dict):
-        return {k: clean_nan_from_dict(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [clean_nan_from_dict(item) for item in obj]
-    elif isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return 0.0
-        return obj
-    return obj
+# Shared across warm invocations of this function
+_FETCHER = DataFetcher()
+
+# Last price written to price_history per symbol, as (price, saved_at)
+_LAST_SAVED_PRICE = {}
+_PRICE_DEDUP_SECONDS = 30
+
+# Static response headers, encoded once per process
+_JSON_HEADERS = header_block([
+    ('Content-type', 'application/json'),
+    ('Vary', 'Accept-Encoding'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+])
+_ERROR_HEADERS = header_block([
+    ('Content-type', 'application/json'),
+    ('Access-Control-Allow-Origin', '*'),
+])
+_PREFLIGHT_HEADERS = header_block([
+    ('Content-Length', '0'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+    ('Access-Control-Max-Age', '86400'),
+])
 
 
 class handler(BaseHTTPRequestHandler):
@@ -47,12 +65,7 @@ class handler(BaseHTTPRequestHandler):
                 return
             
             # Validate symbol
-            valid_symbols = [
-                'BTCUSDT', 'ETHUSDT', 'ETCUSDT', 'SOLUSDT', 'DOGEUSDT',
-                'EURUSD', 'GBPUSD', 'USDJPY', 'GBPJPY', 'AUDUSD', 'USDCAD'
-            ]
-            
-            if symbol not in valid_symbols:
+            if symbol not in VALID_SYMBOLS:
                 self._send_error(400, f'Invalid symbol: {symbol}')
                 return
             
@@ -72,8 +85,7 @@ class handler(BaseHTTPRequestHandler):
         try:
             # Read POST data
             content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = loads(self.rfile.read(content_length))
             
             symbol = data.get('symbol')
             
@@ -95,91 +107,69 @@ class handler(BaseHTTPRequestHandler):
         """Core analysis logic"""
         try:
             # Initialize components
-            fetcher = DataFetcher()
+            fetcher = _FETCHER
             db = get_db()
             
             if not db:
                 return {'error': 'Database connection failed'}
             
             # Determine pair type
-            pair_type = 'crypto' if 'USDT' in symbol else 'forex'
+            pair_type = PAIR_TYPE.get(symbol)
+            if pair_type is None:
+                pair_type = 'crypto' if 'USDT' in symbol else 'forex'
             
-            # Fetch current price
             if pair_type == 'crypto':
-                price_data = fetcher.fetch_crypto_price(symbol)
-                history = fetcher.fetch_crypto_history(symbol, days=7)
+                fetch_price = fetcher.fetch_crypto_price
+                fetch_history = fetcher.fetch_crypto_history
             else:
-                price_data = fetcher.fetch_forex_price(symbol)
-                history = fetcher.fetch_forex_history_eodhd(symbol, days=7)
+                fetch_price = fetcher.fetch_forex_price
+                fetch_history = fetcher.fetch_forex_history_eodhd
+            
+            # Fetch current price, history and news concurrently
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                price_future = pool.submit(fetch_price, symbol)
+                history_future = pool.submit(fetch_history, symbol, days=7, as_frame=True)
+                news_future = pool.submit(db.get_pair_news, symbol, hours=24)
+                
+                price_data = price_future.result()
+                history = history_future.result()
+                news = news_future.result()
             
             if not price_data:
-                db.close()
                 return {'error': f'Failed to fetch price data for {symbol}'}
             
             # If no history available, try from database
-            if not history or len(history) < 14:
+            if len(history) < 14:
                 history = db.get_price_history(symbol, hours=168)
             
             # Need at least 14 data points for technical analysis
-            if not history or len(history) < 14:
+            if len(history) < 14:
                 # Store current price and return basic data
-                basic_result = {
-                    'symbol': symbol,
-                    'type': pair_type,
-                    'price': price_data['price'],
-                    'change_24h': price_data.get('change_24h', 0),
-                    'volume': price_data.get('volume', 0),
-                    'technical': None,
-                    'signal': {
-                        'direction': 'INSUFFICIENT_DATA',
-                        'confidence': 0,
-                        'entry': price_data['price'],
-                        'tp': price_data['price'] * 1.02,
-                        'sl': price_data['price'] * 0.98,
-                        'risk_reward': 2.0
-                    },
-                    'timestamp': datetime.utcnow()
-                }
-                
-                # Clean NaN values
-                basic_result = clean_nan_from_dict(basic_result)
-                
+                basic_result = insufficient_data_analysis(symbol, pair_type, price_data)
                 db.save_pair_analysis(basic_result)
-                db.close()
                 return basic_result
             
-            # Save current price to history
-            current_candle = {
-                'symbol': symbol,
-                'timestamp': datetime.utcnow(),
-                'open': price_data['price'],
-                'high': price_data['price'],
-                'low': price_data['price'],
-                'close': price_data['price'],
-                'volume': price_data.get('volume', 0)
-            }
-            db.save_price_history(symbol, current_candle)
-            
-            # Perform technical analysis
-            analyzer = TechnicalAnalyzer(history)
+            # Save current price to history, unless it is the same price we
+            # stored moments ago
+            now = datetime.utcnow()
+            last_saved = _LAST_SAVED_PRICE.get(symbol)
             
-            rsi = analyzer.calculate_rsi()
-            macd = analyzer.calculate_macd()
-            bb = analyzer.calculate_bollinger_bands()
-            atr = analyzer.calculate_atr()
-            sr = analyzer.find_support_resistance()
-            trend = analyzer.get_trend()
-            volume = analyzer.calculate_volume_analysis()
+            if (not last_saved or last_saved[0] != price_data['price'] or
+                    (now - last_saved[1]).total_seconds() >= _PRICE_DEDUP_SECONDS):
+                current_candle = {
+                    'symbol': symbol,
+                    'timestamp': now,
+                    'open': price_data['price'],
+                    'high': price_data['price'],
+                    'low': price_data['price'],
+                    'close': price_data['price'],
+                    'volume': price_data.get('volume', 0)
+                }
+                db.save_price_history(symbol, current_candle)
+                _LAST_SAVED_PRICE[symbol] = (price_data['price'], now)
             
-            technical_data = {
-                'rsi': rsi,
-                'macd': macd,
-                'bollinger_bands': bb,
-                'atr': atr,
-                'support_resistance': sr,
-                'trend': trend,
-                'volume': volume
-            }
+            # Perform technical analysis (memoized per unchanged history)
+            technical_data = compute_technical_data(symbol, history)
             
             # Generate trading signal
             signal_gen = SignalGenerator(technical_data, price_data['price'])
@@ -199,17 +189,14 @@ class handler(BaseHTTPRequestHandler):
             }
             
             # Clean NaN values before saving
-            full_analysis = clean_nan_from_dict(full_analysis)
+            full_analysis = clean_nan_values(full_analysis)
             
             # Save to database
             db.save_pair_analysis(full_analysis)
             
-            # Get relevant news
-            news = db.get_pair_news(symbol, hours=24)
+            # Attach relevant news
             full_analysis['news'] = news[:5] if news else []
             
-            db.close()
-            
             return full_analysis
             
         except Exception as e:
@@ -227,32 +214,31 @@ class handler(BaseHTTPRequestHandler):
         return {k: v[0] if len(v) == 1 else v for k, v in query_params.items()}
     
     def _send_response(self, status_code, data):
-        """Send JSON response"""
+        """Send JSON response, compressed when the client accepts it"""
+        body, encoding = compress_body(dumps(data), self.headers.get('Accept-Encoding', ''))
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        send_header_block(self, _JSON_HEADERS)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
         self.end_headers()
         
-        # Convert datetime objects to strings
-        response = json.dumps(data, default=str)
-        self.wfile.write(response.encode())
+        self.wfile.write(body)
     
     def _send_error(self, status_code, message):
         """Send error response"""
+        body = dumps({'error': message})
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
+        send_header_block(self, _ERROR_HEADERS)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
         
-        error_response = json.dumps({'error': message})
-        self.wfile.write(error_response.encode())
+        self.wfile.write(body)
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        send_header_block(self, _PREFLIGHT_HEADERS)
         self.end_headers()
@@ -3,49 +3,102 @@ Fetch and Process Market News
 Place in: /api/fetch-news.py
 """
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
-import math
+import re
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from database import get_db
+from serialization import dumps, loads
+from compression import compress_body
+from responses import header_block, send_header_block
 from fetchers import DataFetcher
+from constants import TRADING_PAIRS
 
 
-def clean_nan_from_dict(obj):
-    """Recursively clean NaN values from dictionaries"""
-    if isinstance(obj, dict):
-        return {k: clean_nan_from_dict(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [clean_nan_from_dict(item) for item in obj]
-    elif isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return 0.0
-        return obj
-    return obj
+# Shared across warm invocations of this function
+_FETCHER = DataFetcher()
+
+# Market-related terms used to keep articles that match no specific pair
+_GENERAL_TERMS_RE = re.compile(
+    'market|trading|economy|crypto|forex|currency|bitcoin',
+    re.IGNORECASE
+)
+
+# Static response headers, encoded once per process
+_JSON_HEADERS = header_block([
+    ('Content-type', 'application/json'),
+    ('Vary', 'Accept-Encoding'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+])
+_ERROR_HEADERS = header_block([
+    ('Content-type', 'application/json'),
+    ('Access-Control-Allow-Origin', '*'),
+])
+_PREFLIGHT_HEADERS = header_block([
+    ('Content-Length', '0'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+    ('Access-Control-Max-Age', '86400'),
+])
+
+
+def _score_article(article):
+    """Score a single article, returns None if it was skipped"""
+    fetcher = _FETCHER
+    
+    # Determine relevant pairs
+    relevant_pairs = fetcher.analyze_news_relevance(article, TRADING_PAIRS)
+    
+    # If no specific pairs found, include article but mark as general
+    if not relevant_pairs:
+        # Check if it's at least market-related
+        text = f"{article.get('title', '')} {article.get('description', '')}"
+        
+        if _GENERAL_TERMS_RE.search(text):
+            # Assign to major pairs as general market news
+            relevant_pairs = ['BTCUSDT', 'EURUSD']
+            print(f"Article assigned to general pairs: {article.get('title', '')[:50]}")
+        else:
+            # Skip completely irrelevant articles
+            print(f"Skipped irrelevant article: {article.get('title', '')[:50]}")
+            return None
+    
+    # Calculate sentiment and impact
+    sentiment = fetcher.calculate_sentiment(article)
+    impact_score = fetcher.calculate_impact_score(article, relevant_pairs)
+    
+    news_data = {
+        'title': article['title'],
+        'source': article['source'],
+        'url': article.get('url', ''),
+        'published_at': article['published_at'],
+        'sentiment': sentiment,
+        'relevant_pairs': relevant_pairs,
+        'impact_score': impact_score
+    }
+    
+    print(f"Scored article for pairs {relevant_pairs}: {article.get('title', '')[:50]}")
+    return news_data
 
 
 class handler(BaseHTTPRequestHandler):
     """News fetching serverless function"""
     
     def do_GET(self):
-        """Fetch and process news"""
+        """Fetch, score and save news"""
         try:
-            fetcher = DataFetcher()
+            fetcher = _FETCHER
             db = get_db()
             
             if not db:
                 self._send_error(500, 'Database connection failed')
                 return
             
-            # Define trading pairs
-            trading_pairs = [
-                'BTCUSDT', 'ETHUSDT', 'ETCUSDT', 'SOLUSDT', 'DOGEUSDT',
-                'EURUSD', 'GBPUSD', 'USDJPY', 'GBPJPY', 'AUDUSD', 'USDCAD'
-            ]
-            
             # Fetch news articles
             articles = fetcher.fetch_market_news()
             
@@ -59,65 +112,25 @@ class handler(BaseHTTPRequestHandler):
                 })
                 return
             
-            # Process each article
-            processed_count = 0
-            skipped_count = 0
-            
-            for article in articles:
-                # Determine relevant pairs
-                relevant_pairs = fetcher.analyze_news_relevance(article, trading_pairs)
-                
-                # If no specific pairs found, include article but mark as general
-                if not relevant_pairs:
-                    # Check if it's at least market-related
-                    text = f"{article.get('title', '')} {article.get('description', '')}".lower()
-                    general_terms = ['market', 'trading', 'economy', 'crypto', 'forex', 'currency', 'bitcoin']
-                    
-                    if any(term in text for term in general_terms):
-                        # Assign to major pairs as general market news
-                        relevant_pairs = ['BTCUSDT', 'EURUSD']
-                        print(f"Article assigned to general pairs: {article.get('title', '')[:50]}")
-                    else:
-                        # Skip completely irrelevant articles
-                        skipped_count += 1
-                        print(f"Skipped irrelevant article: {article.get('title', '')[:50]}")
-                        continue
-                
-                # Calculate sentiment and impact
-                sentiment = fetcher.calculate_sentiment(article)
-                impact_score = fetcher.calculate_impact_score(article, relevant_pairs)
-                
-                # Save to database
-                news_data = {
-                    'title': article['title'],
-                    'source': article['source'],
-                    'url': article.get('url', ''),
-                    'published_at': article['published_at'],
-                    'sentiment': sentiment,
-                    'relevant_pairs': relevant_pairs,
-                    'impact_score': impact_score
-                }
-                
-                # Clean NaN values
-                news_data = clean_nan_from_dict(news_data)
-                
-                db.save_news(news_data)
-                processed_count += 1
-                
-                print(f"Saved article for pairs {relevant_pairs}: {article.get('title', '')[:50]}")
-            
-            # Clean up old news (keep last 7 days)
-            deleted = db.cleanup_old_news(days_to_keep=7)
-            
-            db.close()
-            
-            print(f"Final stats - Processed: {processed_count}, Skipped: {skipped_count}, Deleted old: {deleted}")
+            # Scoring is pure Python and holds the GIL, so a plain loop is fastest
+            outcomes = [_score_article(article) for article in articles]
+            
+            pending = [news_data for news_data in outcomes if news_data]
+            processed_count = len(pending)
+            skipped_count = len(outcomes) - processed_count
+            
+            # Save all articles in one bulk write before responding
+            db.save_news_bulk(pending)
+            
+            # Old news is expired by the TTL index on published_at
+            print(f"Final stats - Processed: {processed_count}, Skipped: {skipped_count}")
             
             self._send_response(200, {
                 'success': True,
                 'processed': processed_count,
                 'skipped': skipped_count,
-                'deleted_old': deleted,
+                # Kept for older clients; the TTL index does the deleting
+                'deleted_old': 0,
                 'message': f'Successfully processed {processed_count} news articles (skipped {skipped_count})'
             })
             
@@ -130,8 +143,7 @@ class handler(BaseHTTPRequestHandler):
         try:
             # Read POST data
             content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = loads(self.rfile.read(content_length))
             
             symbol = data.get('symbol')
             hours = data.get('hours', 24)
@@ -148,46 +160,41 @@ class handler(BaseHTTPRequestHandler):
             # Get pair-specific news
             news = db.get_pair_news(symbol, hours=hours)
             
-            # Clean NaN values from news data
-            cleaned_news = [clean_nan_from_dict(article) for article in news]
-            
-            db.close()
-            
             self._send_response(200, {
                 'symbol': symbol,
-                'count': len(cleaned_news),
-                'news': cleaned_news
+                'count': len(news),
+                'news': news
             })
             
         except Exception as e:
             self._send_error(500, f'Error: {str(e)}')
     
     def _send_response(self, status_code, data):
-        """Send JSON response"""
+        """Send JSON response, compressed when the client accepts it"""
+        body, encoding = compress_body(dumps(data), self.headers.get('Accept-Encoding', ''))
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        send_header_block(self, _JSON_HEADERS)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
         self.end_headers()
         
-        response = json.dumps(data, default=str)
-        self.wfile.write(response.encode())
+        self.wfile.write(body)
     
     def _send_error(self, status_code, message):
         """Send error response"""
+        body = dumps({'error': message})
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
+        send_header_block(self, _ERROR_HEADERS)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
         
-        error_response = json.dumps({'error': message})
-        self.wfile.write(error_response.encode())
+        self.wfile.write(body)
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        send_header_block(self, _PREFLIGHT_HEADERS)
         self.end_headers()
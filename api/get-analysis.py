@@ -5,14 +5,46 @@ Place in: /api/get-analysis.py
 This endpoint serves pre-computed analysis from MongoDB to the HTML frontend
 """
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
-import math
+import hashlib
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from database import get_db
+from serialization import dumps, dumps_array, loads
+from compression import compress_body
+from responses import header_block, send_header_block
+from cache import TTLCache
+
+
+# Dashboard aggregates only change when the scheduled update runs
+_CACHE = TTLCache(ttl=15, maxsize=32)
+
+# Serialized GET responses as (body, etag), keyed by query string
+_RESPONSE_CACHE = TTLCache(ttl=30, maxsize=64)
+
+_CACHE_CONTROL = 'public, max-age=10, stale-while-revalidate=60'
+
+# Static response headers, encoded once per process
+_JSON_HEADERS = header_block([
+    ('Content-type', 'application/json'),
+    ('Vary', 'Accept-Encoding'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+])
+_ERROR_HEADERS = header_block([
+    ('Content-type', 'application/json'),
+    ('Access-Control-Allow-Origin', '*'),
+])
+_PREFLIGHT_HEADERS = header_block([
+    ('Content-Length', '0'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+    ('Access-Control-Max-Age', '86400'),
+])
 
 
 class handler(BaseHTTPRequestHandler):
@@ -25,6 +57,13 @@ class handler(BaseHTTPRequestHandler):
             symbol = query.get('symbol')
             pair_type = query.get('type')  # 'crypto' or 'forex'
             
+            # Repeated dashboard polls are answered without Mongo or encoding
+            cache_key = tuple(sorted((k, str(v)) for k, v in query.items()))
+            cached = _RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                self._send_body(200, *cached)
+                return
+            
             db = get_db()
             if not db:
                 self._send_error(500, 'Database connection failed')
@@ -32,75 +71,40 @@ class handler(BaseHTTPRequestHandler):
             
             # Get specific pair
             if symbol:
-                analysis = db.get_pair_analysis(symbol)
+                # Analysis and its news for this pair in one query
+                analysis = db.get_pair_analysis_with_news(symbol, hours=24, news_limit=5)
                 if analysis:
-                    # Remove MongoDB _id field
-                    if '_id' in analysis:
-                        del analysis['_id']
-                    
-                    # Clean NaN values
-                    analysis = self._clean_nan_values(analysis)
-                    
-                    # Get news for this pair
-                    news = db.get_pair_news(symbol, hours=24)
-                    if news:
-                        analysis['news'] = [self._clean_nan_values(n) for n in news[:5]]
-                    else:
-                        analysis['news'] = []
-                    
-                    self._send_response(200, analysis)
+                    self._send_response(200, analysis, cache_key=cache_key)
                 else:
                     self._send_error(404, f'No analysis found for {symbol}')
                 
-                db.close()
                 return
             
-            # Get all pairs
-            pairs = db.get_all_pairs(pair_type=pair_type)
-            
-            # Clean up MongoDB _id fields and NaN values
-            cleaned_pairs = []
-            for pair in pairs:
-                if '_id' in pair:
-                    del pair['_id']
-                cleaned_pair = self._clean_nan_values(pair)
-                cleaned_pairs.append(cleaned_pair)
+            # Get all pairs, encoded straight off the cursor
+            pairs = dumps_array(db.iter_all_pairs(pair_type=pair_type))
             
             # Get system stats
-            stats = db.get_system_stats()
+            stats = _CACHE.get_or_set(('stats',), db.get_system_stats)
             
             # Get high confidence signals
-            high_conf = db.get_high_confidence_signals(min_confidence=75)
-            cleaned_high_conf = []
-            for pair in high_conf:
-                if '_id' in pair:
-                    del pair['_id']
-                cleaned_pair = self._clean_nan_values(pair)
-                cleaned_high_conf.append(cleaned_pair)
+            high_conf = _CACHE.get_or_set(
+                ('high_confidence', 75),
+                lambda: db.get_high_confidence_signals(min_confidence=75)
+            )
             
             # Get recent news (last 24 hours, limit 20)
             all_news = db.get_recent_news(hours=24, limit=20)
-            cleaned_news = []
-            if all_news:
-                for news_item in all_news:
-                    if '_id' in news_item:
-                        del news_item['_id']
-                    cleaned_news_item = self._clean_nan_values(news_item)
-                    cleaned_news.append(cleaned_news_item)
-            
-            db.close()
             
+            # Stored analyses are NaN-cleaned when they are written, so the
+            # documents are serialized as-is
             result = {
-                'pairs': cleaned_pairs,
-                'high_confidence': cleaned_high_conf,
-                'news': cleaned_news,
+                'pairs': pairs,
+                'high_confidence': high_conf,
+                'news': all_news,
                 'stats': stats
             }
             
-            # Final clean of entire response
-            result = self._clean_nan_values(result)
-            
-            self._send_response(200, result)
+            self._send_response(200, result, cache_key=cache_key)
             
         except Exception as e:
             print(f"Error in get_analysis: {str(e)}")
@@ -110,8 +114,7 @@ class handler(BaseHTTPRequestHandler):
         """Get multiple pairs or filtered data"""
         try:
             content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = loads(self.rfile.read(content_length))
             
             symbols = data.get('symbols', [])
             min_confidence = data.get('min_confidence', 0)
@@ -123,71 +126,34 @@ class handler(BaseHTTPRequestHandler):
             
             result = {}
             
-            # Get specific symbols if provided
+            # Get specific symbols if provided, in a single query with the
+            # confidence filter applied by Mongo
             if symbols:
-                result['pairs'] = []
-                for symbol in symbols:
-                    analysis = db.get_pair_analysis(symbol)
-                    if analysis:
-                        if '_id' in analysis:
-                            del analysis['_id']
-                        analysis = self._clean_nan_values(analysis)
-                        result['pairs'].append(analysis)
+                pairs = db.get_pairs_analysis(symbols, min_confidence=min_confidence)
             else:
                 # Get all pairs
-                all_pairs = db.get_all_pairs()
-                cleaned_pairs = []
-                for pair in all_pairs:
-                    if '_id' in pair:
-                        del pair['_id']
-                    cleaned_pair = self._clean_nan_values(pair)
-                    cleaned_pairs.append(cleaned_pair)
-                result['pairs'] = cleaned_pairs
-            
-            # Filter by confidence if specified
-            if min_confidence > 0:
-                result['pairs'] = [
-                    p for p in result['pairs']
-                    if p.get('signal', {}).get('confidence', 0) >= min_confidence
-                ]
+                pairs = _CACHE.get_or_set(('pairs', None), db.get_all_pairs)
+                
+                # Filter by confidence if specified
+                if min_confidence > 0:
+                    pairs = [
+                        p for p in pairs
+                        if p.get('signal', {}).get('confidence', 0) >= min_confidence
+                    ]
+            
+            result['pairs'] = pairs
             
             # Get recent news
-            recent_news = db.get_recent_news(hours=24, limit=20)
-            cleaned_news = []
-            if recent_news:
-                for news_item in recent_news:
-                    if '_id' in news_item:
-                        del news_item['_id']
-                    cleaned_news_item = self._clean_nan_values(news_item)
-                    cleaned_news.append(cleaned_news_item)
-            result['news'] = cleaned_news
+            result['news'] = db.get_recent_news(hours=24, limit=20)
             
             # Get stats
-            result['stats'] = db.get_system_stats()
-            
-            db.close()
-            
-            # Clean entire result
-            result = self._clean_nan_values(result)
+            result['stats'] = _CACHE.get_or_set(('stats',), db.get_system_stats)
             
             self._send_response(200, result)
             
         except Exception as e:
             self._send_error(500, f'Error: {str(e)}')
     
-    def _clean_nan_values(self, obj):
-        """Recursively clean NaN, inf, and None values from nested structures"""
-        if isinstance(obj, dict):
-            return {k: self._clean_nan_values(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._clean_nan_values(item) for item in obj]
-        elif isinstance(obj, float):
-            if math.isnan(obj) or math.isinf(obj):
-                return 0.0
-            return obj
-        else:
-            return obj
-    
     def _parse_query(self):
         """Parse URL query parameters"""
         from urllib.parse import urlparse, parse_qs
@@ -197,32 +163,66 @@ class handler(BaseHTTPRequestHandler):
         
         return {k: v[0] if len(v) == 1 else v for k, v in query_params.items()}
     
-    def _send_response(self, status_code, data):
-        """Send JSON response"""
+    def _send_response(self, status_code, data, cache_key=None):
+        """Send JSON response, caching successful GET bodies under cache_key"""
+        body = dumps(data)
+        etag = None
+        
+        if self.command == 'GET' and status_code == 200:
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            
+            if cache_key is not None:
+                _RESPONSE_CACHE.set(cache_key, (body, etag))
+        
+        self._send_body(status_code, body, etag)
+    
+    def _send_body(self, status_code, body, etag=None):
+        """Send a serialized JSON body, answering 304 when the client copy is current"""
+        if etag and self._etag_matches(etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', _CACHE_CONTROL)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        
+        body, encoding = compress_body(body, self.headers.get('Accept-Encoding', ''))
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        send_header_block(self, _JSON_HEADERS)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if etag:
+            # A strong ETag names one exact encoding of the body
+            self.send_header('ETag', f'W/{etag}' if encoding else etag)
+            self.send_header('Cache-Control', _CACHE_CONTROL)
         self.end_headers()
         
-        response = json.dumps(data, default=str)
-        self.wfile.write(response.encode())
+        self.wfile.write(body)
+    
+    def _etag_matches(self, etag):
+        """Check the request's If-None-Match header against an ETag"""
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
     
     def _send_error(self, status_code, message):
         """Send error response"""
+        body = dumps({'error': message})
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
+        send_header_block(self, _ERROR_HEADERS)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
         
-        error_response = json.dumps({'error': message})
-        self.wfile.write(error_response.encode())
+        self.wfile.write(body)
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        send_header_block(self, _PREFLIGHT_HEADERS)
         self.end_headers()
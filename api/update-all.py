@@ -5,31 +5,44 @@ Place in: /api/update-all.py
 This endpoint is called by GitHub Actions to update all pairs periodically
 """
 from http.server import BaseHTTPRequestHandler
-import json
 import sys
 import os
-import time
-import math
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 
 from database import get_db
+from serialization import dumps, clean_nan_values
+from compression import compress_body
+from responses import header_block, send_header_block
 from fetchers import DataFetcher
-from technical import TechnicalAnalyzer, SignalGenerator
+from technical import SignalGenerator, compute_technical_data, insufficient_data_analysis
+from constants import CRYPTO_PAIRS, FOREX_PAIRS, TRADING_PAIRS
 
 
-def clean_nan_from_dict(obj):
-    """Recursively clean NaN values from dictionaries"""
-    if isinstance(obj, dict):
-        return {k: clean_nan_from_dict(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [clean_nan_from_dict(item) for item in obj]
-    elif isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return 0.0
-        return obj
-    return obj
+# Shared across warm invocations of this function
+_FETCHER = DataFetcher()
+
+# Static response headers, encoded once per process
+_JSON_HEADERS = header_block([
+    ('Content-type', 'application/json'),
+    ('Vary', 'Accept-Encoding'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type, Authorization'),
+])
+_ERROR_HEADERS = header_block([
+    ('Content-type', 'application/json'),
+    ('Access-Control-Allow-Origin', '*'),
+])
+_PREFLIGHT_HEADERS = header_block([
+    ('Content-Length', '0'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type, Authorization'),
+    ('Access-Control-Max-Age', '86400'),
+])
 
 
 class handler(BaseHTTPRequestHandler):
@@ -47,17 +60,13 @@ class handler(BaseHTTPRequestHandler):
                 return
             
             # Initialize
-            fetcher = DataFetcher()
+            fetcher = _FETCHER
             db = get_db()
             
             if not db:
                 self._send_error(500, 'Database connection failed')
                 return
             
-            # Define all pairs
-            crypto_pairs = ['BTCUSDT', 'ETHUSDT', 'ETCUSDT', 'SOLUSDT', 'DOGEUSDT']
-            forex_pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'GBPJPY', 'AUDUSD', 'USDCAD']
-            
             results = {
                 'timestamp': datetime.utcnow(),
                 'crypto': {'success': 0, 'failed': 0, 'pairs': []},
@@ -65,71 +74,47 @@ class handler(BaseHTTPRequestHandler):
                 'news': {'processed': 0}
             }
             
-            # Process crypto pairs
-            for symbol in crypto_pairs:
-                try:
-                    result = self._analyze_pair(symbol, 'crypto', fetcher, db)
-                    if result['success']:
-                        results['crypto']['success'] += 1
-                        results['crypto']['pairs'].append({
-                            'symbol': symbol,
-                            'status': 'success',
-                            'confidence': result.get('confidence', 0)
-                        })
-                    else:
-                        results['crypto']['failed'] += 1
-                        results['crypto']['pairs'].append({
-                            'symbol': symbol,
-                            'status': 'failed',
-                            'error': result.get('error', 'Unknown error')
-                        })
-                    
-                    time.sleep(2)  # Rate limiting
-                    
-                except Exception as e:
-                    results['crypto']['failed'] += 1
-                    results['crypto']['pairs'].append({
-                        'symbol': symbol,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+            # Analyses and candles are collected by the workers and written
+            # in one bulk write each once every pair is done
+            pending_analyses = []
+            pending_candles = []
             
-            # Process forex pairs
-            for symbol in forex_pairs:
-                try:
-                    result = self._analyze_pair(symbol, 'forex', fetcher, db)
-                    if result['success']:
-                        results['forex']['success'] += 1
-                        results['forex']['pairs'].append({
-                            'symbol': symbol,
-                            'status': 'success',
-                            'confidence': result.get('confidence', 0)
-                        })
-                    else:
-                        results['forex']['failed'] += 1
-                        results['forex']['pairs'].append({
-                            'symbol': symbol,
-                            'status': 'failed',
-                            'error': result.get('error', 'Unknown error')
-                        })
-                    
-                    time.sleep(3)  # Longer delay for forex (API limits)
+            # Analyze all pairs concurrently. The work is dominated by API
+            # calls, and the fetcher's token buckets pace every provider
+            # (CoinGecko, Polygon, EODHD and Alpha Vantage).
+            # Current prices are fetched as one batch, and the news, alongside
+            # the per-pair history fetches
+            with ThreadPoolExecutor(max_workers=len(TRADING_PAIRS) + 2) as pool:
+                prices = pool.submit(fetcher.fetch_prices, TRADING_PAIRS)
+                news = pool.submit(fetcher.fetch_market_news)
+                
+                futures = [
+                    (pair_type, symbol, pool.submit(
+                        self._analyze_pair, symbol, pair_type, prices, fetcher, db,
+                        pending_analyses, pending_candles
+                    ))
+                    for pair_type, symbols in (('crypto', CRYPTO_PAIRS), ('forex', FOREX_PAIRS))
+                    for symbol in symbols
+                ]
+                
+                for pair_type, symbol, future in futures:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'success': False, 'error': str(e)}
                     
-                except Exception as e:
-                    results['forex']['failed'] += 1
-                    results['forex']['pairs'].append({
-                        'symbol': symbol,
-                        'status': 'failed',
-                        'error': str(e)
-                    })
+                    self._record_result(results[pair_type], symbol, result)
+            
+            db.bulk_save_price_history(pending_candles)
+            db.bulk_save_pair_analysis(pending_analyses)
             
-            # Fetch and process news
+            # Process the news fetched alongside the pairs
             try:
-                articles = fetcher.fetch_market_news()
-                all_pairs = crypto_pairs + forex_pairs
+                articles = news.result()
+                pending_news = []
                 
                 for article in articles:
-                    relevant_pairs = fetcher.analyze_news_relevance(article, all_pairs)
+                    relevant_pairs = fetcher.analyze_news_relevance(article, TRADING_PAIRS)
                     sentiment = fetcher.calculate_sentiment(article)
                     impact_score = fetcher.calculate_impact_score(article, relevant_pairs)
                     
@@ -143,53 +128,69 @@ class handler(BaseHTTPRequestHandler):
                         'impact_score': impact_score
                     }
                     
-                    db.save_news(news_data)
+                    pending_news.append(news_data)
                     results['news']['processed'] += 1
+                
+                db.save_news_bulk(pending_news)
                     
             except Exception as e:
                 results['news']['error'] = str(e)
             
-            # Cleanup old data
-            deleted_prices = db.cleanup_old_prices(days_to_keep=30)
-            deleted_news = db.cleanup_old_news(days_to_keep=7)
-            
-            results['cleanup'] = {
-                'deleted_prices': deleted_prices,
-                'deleted_news': deleted_news
-            }
-            
             # Update system metadata
             db.update_last_run('bulk_update')
             
             # Get system stats
             results['stats'] = db.get_system_stats()
             
-            db.close()
+            # Index build failures mean the TTL retention may not be running
+            if db.index_errors:
+                results['index_errors'] = db.index_errors
             
             self._send_response(200, results)
             
         except Exception as e:
             self._send_error(500, f'Error: {str(e)}')
     
-    def _analyze_pair(self, symbol, pair_type, fetcher, db):
-        """Analyze single pair (helper function)"""
+    def _record_result(self, summary, symbol, result):
+        """Add one pair's outcome to the crypto/forex summary"""
+        if result['success']:
+            summary['success'] += 1
+            summary['pairs'].append({
+                'symbol': symbol,
+                'status': 'success',
+                'confidence': result.get('confidence', 0)
+            })
+        else:
+            summary['failed'] += 1
+            summary['pairs'].append({
+                'symbol': symbol,
+                'status': 'failed',
+                'error': result.get('error', 'Unknown error')
+            })
+    
+    def _analyze_pair(self, symbol, pair_type, prices, fetcher, db, pending_analyses, pending_candles):
+        """
+        Analyze single pair (helper function)
+        prices: future resolving to the batch of current prices by symbol
+        The analysis and current candle are appended to the pending lists for
+        the caller to save
+        """
         try:
-            # Fetch current price
             if pair_type == 'crypto':
-                price_data = fetcher.fetch_crypto_price(symbol)
-                history = fetcher.fetch_crypto_history(symbol, days=7)
+                history = fetcher.fetch_crypto_history(symbol, days=7, as_frame=True)
             else:
-                price_data = fetcher.fetch_forex_price(symbol)
-                history = fetcher.fetch_forex_history_eodhd(symbol, days=7)
+                history = fetcher.fetch_forex_history_eodhd(symbol, days=7, as_frame=True)
+            
+            price_data = prices.result().get(symbol)
             
             if not price_data:
                 return {'success': False, 'error': 'Failed to fetch price data'}
             
             # Get or use existing history
-            if not history or len(history) < 14:
+            if len(history) < 14:
                 history = db.get_price_history(symbol, hours=168)
             
-            # Save current price
+            # Queue current price for the bulk save
             current_candle = {
                 'symbol': symbol,
                 'timestamp': datetime.utcnow(),
@@ -199,47 +200,17 @@ class handler(BaseHTTPRequestHandler):
                 'close': price_data['price'],
                 'volume': price_data.get('volume', 0)
             }
-            db.save_price_history(symbol, current_candle)
+            pending_candles.append(current_candle)
             
             # Check if we have enough data
-            if not history or len(history) < 14:
+            if len(history) < 14:
                 # Store basic data
-                basic_result = {
-                    'symbol': symbol,
-                    'type': pair_type,
-                    'price': price_data['price'],
-                    'change_24h': price_data.get('change_24h', 0),
-                    'volume': price_data.get('volume', 0),
-                    'technical': None,
-                    'signal': {
-                        'direction': 'INSUFFICIENT_DATA',
-                        'confidence': 0,
-                        'entry': price_data['price'],
-                        'tp': price_data['price'] * 1.02,
-                        'sl': price_data['price'] * 0.98,
-                        'risk_reward': 2.0
-                    },
-                    'timestamp': datetime.utcnow()
-                }
-                
-                # Clean NaN values
-                basic_result = clean_nan_from_dict(basic_result)
-                
-                db.save_pair_analysis(basic_result)
+                basic_result = insufficient_data_analysis(symbol, pair_type, price_data)
+                pending_analyses.append(basic_result)
                 return {'success': True, 'confidence': 0, 'note': 'Insufficient data'}
             
-            # Perform technical analysis
-            analyzer = TechnicalAnalyzer(history)
-            
-            technical_data = {
-                'rsi': analyzer.calculate_rsi(),
-                'macd': analyzer.calculate_macd(),
-                'bollinger_bands': analyzer.calculate_bollinger_bands(),
-                'atr': analyzer.calculate_atr(),
-                'support_resistance': analyzer.find_support_resistance(),
-                'trend': analyzer.get_trend(),
-                'volume': analyzer.calculate_volume_analysis()
-            }
+            # Perform technical analysis (memoized per unchanged history)
+            technical_data = compute_technical_data(symbol, history)
             
             # Generate signal
             signal_gen = SignalGenerator(technical_data, price_data['price'])
@@ -259,9 +230,9 @@ class handler(BaseHTTPRequestHandler):
             }
             
             # Clean NaN values
-            full_analysis = clean_nan_from_dict(full_analysis)
+            full_analysis = clean_nan_values(full_analysis)
             
-            db.save_pair_analysis(full_analysis)
+            pending_analyses.append(full_analysis)
             
             return {
                 'success': True,
@@ -272,31 +243,31 @@ class handler(BaseHTTPRequestHandler):
             return {'success': False, 'error': str(e)}
     
     def _send_response(self, status_code, data):
-        """Send JSON response"""
+        """Send JSON response, compressed when the client accepts it"""
+        body, encoding = compress_body(dumps(data), self.headers.get('Accept-Encoding', ''))
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        send_header_block(self, _JSON_HEADERS)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
         self.end_headers()
         
-        response = json.dumps(data, default=str)
-        self.wfile.write(response.encode())
+        self.wfile.write(body)
     
     def _send_error(self, status_code, message):
         """Send error response"""
+        body = dumps({'error': message})
+        
         self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
+        send_header_block(self, _ERROR_HEADERS)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
         
-        error_response = json.dumps({'error': message})
-        self.wfile.write(error_response.encode())
+        self.wfile.write(body)
     
     def do_OPTIONS(self):
         """Handle CORS preflight"""
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        send_header_block(self, _PREFLIGHT_HEADERS)
         self.end_headers()
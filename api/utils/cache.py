@@ -0,0 +1,78 @@
+"""
+In-Process Caching Utilities
+Place in: /api/utils/cache.py
+"""
+import threading
+import time
+import weakref
+
+_MISSING = object()
+
+# Every cache created in this process, so writers can invalidate them all
+_INSTANCES = weakref.WeakSet()
+
+
+class TTLCache:
+    """Small thread-safe cache whose entries expire after a fixed time"""
+    
+    def __init__(self, ttl=15, maxsize=32):
+        """
+        ttl: seconds an entry stays valid
+        maxsize: maximum number of entries kept at once
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+        _INSTANCES.add(self)
+    
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                self._entries.pop(key, None)
+            return default
+        
+        return value
+    
+    def set(self, key, value):
+        """Store value under key for the next ttl seconds"""
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.maxsize:
+                self._evict()
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+    
+    def get_or_set(self, key, loader):
+        """Return the cached value for key, calling loader() to fill it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def _evict(self):
+        """Drop expired entries, or the oldest one if none have expired"""
+        now = time.monotonic()
+        expired = [k for k, (expires_at, _) in self._entries.items() if expires_at < now]
+        
+        for key in expired:
+            del self._entries[key]
+        
+        if not expired and self._entries:
+            del self._entries[next(iter(self._entries))]
+
+
+def clear_all():
+    """Drop every entry of every cache in this process (called after writes)"""
+    for cache in list(_INSTANCES):
+        cache.clear()
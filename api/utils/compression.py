@@ -0,0 +1,45 @@
+"""
+HTTP Response Compression
+Place in: /api/utils/compression.py
+"""
+import gzip
+
+# Brotli is optional: gzip is used when it is not installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+def _accepted_encodings(accept_encoding):
+    """Encodings named in an Accept-Encoding header, minus any with q=0"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def compress_body(body, accept_encoding):
+    """
+    Compress a response body for the client's Accept-Encoding header
+    Returns (body, content_encoding), content_encoding is None if unchanged
+    """
+    if len(body) < MIN_COMPRESS_SIZE or not accept_encoding:
+        return body, None
+    
+    accepted = _accepted_encodings(accept_encoding)
+    
+    if brotli is not None and 'br' in accepted:
+        return brotli.compress(body, quality=4), 'br'
+    
+    if 'gzip' in accepted:
+        return gzip.compress(body, compresslevel=1), 'gzip'
+    
+    return body, None
@@ -0,0 +1,17 @@
+"""
+Supported Trading Pairs
+Place in: /api/utils/constants.py
+"""
+
+CRYPTO_PAIRS = ('BTCUSDT', 'ETHUSDT', 'ETCUSDT', 'SOLUSDT', 'DOGEUSDT')
+FOREX_PAIRS = ('EURUSD', 'GBPUSD', 'USDJPY', 'GBPJPY', 'AUDUSD', 'USDCAD')
+
+# All pairs, crypto first
+TRADING_PAIRS = CRYPTO_PAIRS + FOREX_PAIRS
+
+VALID_SYMBOLS = frozenset(TRADING_PAIRS)
+
+PAIR_TYPE = {
+    **dict.fromkeys(CRYPTO_PAIRS, 'crypto'),
+    **dict.fromkeys(FOREX_PAIRS, 'forex')
+}
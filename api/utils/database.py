@@ -3,9 +3,63 @@ MongoDB Connection and Database Utilities
 Place in: /api/utils/database.py
 """
 import os
+import hashlib
+import threading
 from datetime import datetime, timedelta
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.errors import ConnectionFailure
+from pymongo import MongoClient, ASCENDING, DESCENDING, UpdateOne, IndexModel
+from pymongo.errors import ConnectionFailure, OperationFailure, DuplicateKeyError, BulkWriteError
+from bson.binary import Binary
+from cache import clear_all as clear_caches
+
+# Default read projection: the handlers never need Mongo's _id
+NO_ID_PROJECTION = {'_id': 0}
+
+# News reads also leave out the binary dedup key
+NEWS_PROJECTION = {'_id': 0, 'dedup': 0}
+
+# Candle fields the technical analysis reads
+CANDLE_PROJECTION = {
+    '_id': 0, 'timestamp': 1, 'open': 1, 'high': 1, 'low': 1, 'close': 1, 'volume': 1
+}
+
+# News articles expire a week after publication, candles after 30 days
+NEWS_TTL_SECONDS = 7 * 24 * 3600
+PRICE_HISTORY_TTL_SECONDS = 30 * 24 * 3600
+
+# Unique candle key; also the index get_price_history's planner picks
+PRICE_HISTORY_KEY = [('symbol', ASCENDING), ('timestamp', ASCENDING)]
+
+# Indexes backing the handler read paths, per collection, so each is
+# created in one createIndexes round trip
+INDEXES = {
+    'pairs_analysis': [
+        IndexModel([('symbol', ASCENDING)], unique=True),
+        IndexModel([('type', ASCENDING), ('signal.confidence', DESCENDING)]),
+        IndexModel([('signal.confidence', DESCENDING)]),
+        IndexModel([('updated_at', DESCENDING)]),
+    ],
+    'price_history': [
+        # Unique keys the save methods deduplicate on; also serves get_price_history
+        IndexModel(PRICE_HISTORY_KEY, unique=True),
+        # TTL index: Mongo deletes expired candles in the background
+        IndexModel([('timestamp', ASCENDING)], expireAfterSeconds=PRICE_HISTORY_TTL_SECONDS),
+    ],
+    'news': [
+        # Partial, so articles stored before the dedup key existed do not collide
+        IndexModel([('dedup', ASCENDING)], unique=True,
+                   partialFilterExpression={'dedup': {'$exists': True}}),
+        IndexModel([('relevant_pairs', ASCENDING), ('published_at', DESCENDING)]),
+        # TTL index: Mongo deletes expired articles in the background
+        IndexModel([('published_at', ASCENDING)], expireAfterSeconds=NEWS_TTL_SECONDS),
+    ],
+}
+
+
+def news_dedup_key(news_data):
+    """Fixed-size dedup key for an article: SHA-1 of its title and source"""
+    raw = f"{news_data['title']}|{news_data['source']}".encode('utf-8')
+    return Binary(hashlib.sha1(raw).digest())
+
 
 class TradingDatabase:
     def __init__(self):
@@ -13,14 +67,19 @@ class TradingDatabase:
         self.connection_string = os.environ.get('MONGODB_URI')
         self.client = None
         self.db = None
-        
+        # Indexes that could not be built, reported to the authenticated
+        # update-all caller (never in the public stats)
+        self.index_errors = []
+    
     def connect(self):
         """Establish connection to MongoDB"""
         try:
             self.client = MongoClient(
                 self.connection_string,
-                serverSelectionTimeoutMS=5000,
-                maxPoolSize=10
+                serverSelectionTimeoutMS=3000,
+                maxPoolSize=20,
+                minPoolSize=2,
+                connect=False
             )
             # Test connection
             self.client.admin.command('ping')
@@ -31,9 +90,35 @@ class TradingDatabase:
             return False
     
     def close(self):
-        """Close database connection"""
-        if self.client:
-            self.client.close()
+        """
+        Kept for compatibility: the client is shared by every invocation of a
+        warm instance, so its pool is left open until the process exits
+        """
+        pass
+    
+    def ensure_indexes(self):
+        """
+        Create the indexes the read paths rely on (no-op if they exist)
+        The TTL indexes are the only retention for candles and news, so
+        failures are logged and kept in index_errors rather than dropped
+        """
+        self.index_errors = []
+        
+        for collection_name, models in INDEXES.items():
+            collection = self.db[collection_name]
+            try:
+                collection.create_indexes(models)
+            except OperationFailure:
+                # createIndexes fails as a whole; retry one by one so a single
+                # bad index (e.g. duplicates under a unique key) does not
+                # leave the others unbuilt
+                for model in models:
+                    try:
+                        collection.create_indexes([model])
+                    except OperationFailure as e:
+                        error = f"{collection_name} {model.document['name']}: {e}"
+                        self.index_errors.append(error)
+                        print(f"Error creating index on {error}")
     
     # ==================== PAIRS COLLECTION ====================
     
@@ -76,28 +161,107 @@ class TradingDatabase:
             upsert=True
         )
         
-    def get_pair_analysis(self, symbol):
+        # Cached reads in this process are now stale
+        clear_caches()
+    
+    def bulk_save_pair_analysis(self, pairs):
+        """
+        Save or update analyses for many pairs in a single round-trip
+        Each item has the save_pair_analysis structure
+        """
+        if not pairs:
+            return 0
+        
+        collection = self.db['pairs_analysis']
+        updated_at = datetime.utcnow()
+        
+        operations = []
+        for pair_data in pairs:
+            pair_data['updated_at'] = updated_at
+            operations.append(UpdateOne(
+                {'symbol': pair_data['symbol']},
+                {'$set': pair_data},
+                upsert=True
+            ))
+        
+        result = collection.bulk_write(operations, ordered=False)
+        
+        # Cached reads in this process are now stale
+        clear_caches()
+        
+        return result.upserted_count + result.modified_count
+        
+    def get_pair_analysis(self, symbol, projection=NO_ID_PROJECTION):
         """Get latest analysis for a specific pair"""
         collection = self.db['pairs_analysis']
-        return collection.find_one({'symbol': symbol})
+        return collection.find_one({'symbol': symbol}, projection)
     
-    def get_all_pairs(self, pair_type=None):
+    def get_pair_analysis_with_news(self, symbol, hours=24, news_limit=5):
+        """
+        Get latest analysis for a pair with its most impactful recent news
+        attached as 'news', in one round-trip. Returns None if no analysis
+        """
+        collection = self.db['pairs_analysis']
+        
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        
+        # The news match uses the symbol literally (no $expr), so it can use
+        # the relevant_pairs/published_at index
+        results = list(collection.aggregate([
+            {'$match': {'symbol': symbol}},
+            {'$limit': 1},
+            {'$lookup': {
+                'from': 'news',
+                'pipeline': [
+                    {'$match': {
+                        'relevant_pairs': symbol,
+                        'published_at': {'$gte': cutoff_time}
+                    }},
+                    {'$sort': {'impact_score': DESCENDING}},
+                    {'$limit': news_limit},
+                    {'$project': NEWS_PROJECTION}
+                ],
+                'as': 'news'
+            }},
+            {'$project': NO_ID_PROJECTION}
+        ]))
+        
+        return results[0] if results else None
+    
+    def get_pairs_analysis(self, symbols, min_confidence=0, projection=NO_ID_PROJECTION):
+        """Get latest analysis for several pairs in one query, in the order requested"""
+        collection = self.db['pairs_analysis']
+        
+        symbols = list(symbols)
+        query = {'symbol': {'$in': symbols}}
+        if min_confidence > 0:
+            query['signal.confidence'] = {'$gte': min_confidence}
+        
+        by_symbol = {doc['symbol']: doc for doc in collection.find(query, projection)}
+        
+        return [by_symbol[symbol] for symbol in symbols if symbol in by_symbol]
+    
+    def get_all_pairs(self, pair_type=None, projection=NO_ID_PROJECTION):
         """Get all pairs or filter by type (crypto/forex)"""
+        return list(self.iter_all_pairs(pair_type, projection=projection))
+    
+    def iter_all_pairs(self, pair_type=None, batch_size=50, projection=NO_ID_PROJECTION):
+        """Cursor over all pairs or one type, fetched from Mongo in batches"""
         collection = self.db['pairs_analysis']
         
         query = {}
         if pair_type:
             query['type'] = pair_type
         
-        return list(collection.find(query).sort('symbol', ASCENDING))
+        return collection.find(query, projection).sort('symbol', ASCENDING).batch_size(batch_size)
     
-    def get_high_confidence_signals(self, min_confidence=75):
+    def get_high_confidence_signals(self, min_confidence=75, projection=NO_ID_PROJECTION):
         """Get pairs with high confidence signals"""
         collection = self.db['pairs_analysis']
         
         return list(collection.find({
             'signal.confidence': {'$gte': min_confidence}
-        }).sort('signal.confidence', DESCENDING))
+        }, projection).sort('signal.confidence', DESCENDING))
     
     # ==================== HISTORICAL PRICES ====================
     
@@ -117,16 +281,37 @@ class TradingDatabase:
         """
         collection = self.db['price_history']
         
-        # Avoid duplicates
-        existing = collection.find_one({
-            'symbol': symbol,
-            'timestamp': price_data['timestamp']
-        })
+        # Insert unless this point is already stored
+        collection.update_one(
+            {'symbol': symbol, 'timestamp': price_data['timestamp']},
+            {'$setOnInsert': price_data},
+            upsert=True
+        )
+    
+    def bulk_save_price_history(self, candles):
+        """
+        Save many price points in a single round-trip
+        Points already stored (same symbol and timestamp) are left untouched
+        """
+        if not candles:
+            return 0
+        
+        collection = self.db['price_history']
+        
+        operations = [
+            UpdateOne(
+                {'symbol': candle['symbol'], 'timestamp': candle['timestamp']},
+                {'$setOnInsert': candle},
+                upsert=True
+            )
+            for candle in candles
+        ]
         
-        if not existing:
-            collection.insert_one(price_data)
+        result = collection.bulk_write(operations, ordered=False)
+        
+        return result.upserted_count
     
-    def get_price_history(self, symbol, hours=168):
+    def get_price_history(self, symbol, hours=168, projection=CANDLE_PROJECTION):
         """
         Get historical prices for a symbol
         Default: 168 hours (7 days)
@@ -135,13 +320,19 @@ class TradingDatabase:
         
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         
+        # Equality on symbol plus the timestamp range and sort let the planner
+        # use the (symbol, timestamp) index without a hint, which would fail
+        # outright if that index could not be built
         return list(collection.find({
             'symbol': symbol,
             'timestamp': {'$gte': cutoff_time}
-        }).sort('timestamp', ASCENDING))
+        }, projection).sort('timestamp', ASCENDING))
     
     def cleanup_old_prices(self, days_to_keep=30):
-        """Remove price data older than specified days"""
+        """
+        Remove price data older than specified days
+        Old candles normally expire through the TTL index; this is for manual cleanup
+        """
         collection = self.db['price_history']
         
         cutoff_time = datetime.utcnow() - timedelta(days=days_to_keep)
@@ -168,18 +359,51 @@ class TradingDatabase:
         }
         """
         collection = self.db['news']
+        dedup = news_dedup_key(news_data)
         
-        # Avoid duplicate articles
-        existing = collection.find_one({
-            'title': news_data['title'],
-            'source': news_data['source']
-        })
+        # Insert unless this article is already stored
+        try:
+            collection.update_one(
+                {'dedup': dedup},
+                {'$setOnInsert': {**news_data, 'dedup': dedup, 'created_at': datetime.utcnow()}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Stored concurrently, or before dedup keys were recorded
+            pass
+    
+    def save_news_bulk(self, news_items):
+        """
+        Save many news articles in a single round-trip
+        Articles already stored (same title and source) are left untouched
+        """
+        if not news_items:
+            return 0
+        
+        collection = self.db['news']
+        created_at = datetime.utcnow()
+        
+        operations = []
+        for item in news_items:
+            dedup = news_dedup_key(item)
+            operations.append(UpdateOne(
+                {'dedup': dedup},
+                {'$setOnInsert': {**item, 'dedup': dedup, 'created_at': created_at}},
+                upsert=True
+            ))
+        
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Duplicates were stored concurrently, or before dedup keys were
+            # recorded; anything else is a real failure
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+            return e.details.get('nUpserted', 0)
         
-        if not existing:
-            news_data['created_at'] = datetime.utcnow()
-            collection.insert_one(news_data)
+        return result.upserted_count
     
-    def get_pair_news(self, symbol, hours=24):
+    def get_pair_news(self, symbol, hours=24, projection=NEWS_PROJECTION):
         """Get news relevant to a specific pair"""
         collection = self.db['news']
         
@@ -188,20 +412,23 @@ class TradingDatabase:
         return list(collection.find({
             'relevant_pairs': symbol,
             'published_at': {'$gte': cutoff_time}
-        }).sort('impact_score', DESCENDING).limit(10))
+        }, projection).sort('impact_score', DESCENDING).limit(10))
     
-    def get_recent_news(self, hours=24, limit=20):
+    def get_recent_news(self, hours=24, limit=20, projection=NEWS_PROJECTION):
         """Get all recent news - returns most recent articles regardless of age"""
         collection = self.db['news']
         
         # Simply get the most recent articles by published_at date
         # This ensures we always return articles if they exist, without filtering by cutoff time
-        results = list(collection.find({}).sort('published_at', DESCENDING).limit(limit))
+        results = list(collection.find({}, projection).sort('published_at', DESCENDING).limit(limit))
         
         return results
     
     def cleanup_old_news(self, days_to_keep=7):
-        """Remove news older than specified days"""
+        """
+        Remove news older than specified days
+        Old articles normally expire through the TTL index; this is for manual cleanup
+        """
         collection = self.db['news']
         
         cutoff_time = datetime.utcnow() - timedelta(days=days_to_keep)
@@ -231,26 +458,40 @@ class TradingDatabase:
         """Get when a task last ran"""
         collection = self.db['system_metadata']
         
-        record = collection.find_one({'task': task_name})
+        record = collection.find_one({'task': task_name}, {'_id': 0, 'last_run': 1})
         
         return record['last_run'] if record else None
     
     def get_system_stats(self):
         """Get overview statistics"""
+        pairs = self.db['pairs_analysis']
+        
+        # Filtered pair counts in one round-trip
+        facets = next(pairs.aggregate([{'$facet': {
+            'crypto': [{'$match': {'type': 'crypto'}}, {'$count': 'n'}],
+            'forex': [{'$match': {'type': 'forex'}}, {'$count': 'n'}],
+            'high_confidence': [{'$match': {'signal.confidence': {'$gte': 75}}}, {'$count': 'n'}]
+        }}]))
+        
+        def facet_count(name):
+            return facets[name][0]['n'] if facets[name] else 0
+        
+        # Unfiltered totals come from collection metadata instead of a scan
         stats = {
-            'total_pairs': self.db['pairs_analysis'].count_documents({}),
-            'crypto_pairs': self.db['pairs_analysis'].count_documents({'type': 'crypto'}),
-            'forex_pairs': self.db['pairs_analysis'].count_documents({'type': 'forex'}),
-            'high_confidence_signals': self.db['pairs_analysis'].count_documents({
-                'signal.confidence': {'$gte': 75}
-            }),
-            'news_articles': self.db['news'].count_documents({}),
-            'price_points': self.db['price_history'].count_documents({}),
+            'total_pairs': pairs.estimated_document_count(),
+            'crypto_pairs': facet_count('crypto'),
+            'forex_pairs': facet_count('forex'),
+            'high_confidence_signals': facet_count('high_confidence'),
+            'news_articles': self.db['news'].estimated_document_count(),
+            'price_points': self.db['price_history'].estimated_document_count(),
             'last_update': None
         }
         
-        # Get most recent update
-        latest = self.db['pairs_analysis'].find_one(
+        # Most recent update: a single read from the updated_at index
+        # ($facet sub-pipelines cannot use indexes)
+        latest = pairs.find_one(
+            {},
+            {'_id': 0, 'updated_at': 1},
             sort=[('updated_at', DESCENDING)]
         )
         
@@ -260,10 +501,22 @@ class TradingDatabase:
         return stats
 
 
+# Shared across warm invocations so the connection pool is reused
+_DB = None
+_DB_LOCK = threading.Lock()
+
+
 # Helper function for serverless functions
 def get_db():
-    """Get database instance with connection"""
-    db = TradingDatabase()
-    if db.connect():
-        return db
-    return None
+    """Get the shared database instance, connecting on first use"""
+    global _DB
+    
+    if _DB is None:
+        with _DB_LOCK:
+            if _DB is None:
+                db = TradingDatabase()
+                if db.connect():
+                    db.ensure_indexes()
+                    _DB = db
+    
+    return _DB
@@ -3,33 +3,216 @@ Data Fetching from Multiple APIs
 Place in: /api/utils/fetchers.py
 """
 import os
+import tempfile
+import threading
+import orjson
 import requests
-import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from constants import PAIR_TYPE
+from ratelimit import TokenBucket
+
+# Response caching is optional: a plain session is used without requests-cache
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# Connect timeout for every API call (read timeouts are set per call)
+CONNECT_TIMEOUT = 3
+
+# Trading symbols mapped to CoinGecko coin IDs
+COINGECKO_IDS = {
+    'BTCUSDT': 'bitcoin',
+    'ETHUSDT': 'ethereum',
+    'ETCUSDT': 'ethereum-classic',
+    'SOLUSDT': 'solana',
+    'DOGEUSDT': 'dogecoin'
+}
+
+# Forex price sources in default priority order (fetch_forex_<name> methods)
+FOREX_SOURCES = ('polygon', 'eodhd', 'alphavantage')
+
+# Seconds an API response is served from the HTTP cache, per host
+CACHE_EXPIRE_AFTER = {
+    'api.coingecko.com': 60,
+    'api.polygon.io': 60,
+    'eodhistoricaldata.com': 300,
+    'www.alphavantage.co': 300,
+    'newsapi.org': 300
+}
+
+# API key parameters, kept out of cache keys and stored requests
+_SECRET_PARAMS = ('apiKey', 'api_token', 'apikey')
+
+
+def _build_session():
+    """
+    Create a pooled HTTP session that retries transient server errors
+    Successful responses are cached in /tmp when requests-cache is installed
+    """
+    if requests_cache is not None:
+        # Expired entries that carry an ETag or Last-Modified are revalidated
+        # with If-None-Match / If-Modified-Since, and a 304 reuses the stored body
+        session = requests_cache.CachedSession(
+            os.path.join(tempfile.gettempdir(), 'http_cache'),
+            backend='sqlite',
+            expire_after=requests_cache.DO_NOT_CACHE,
+            urls_expire_after=CACHE_EXPIRE_AFTER,
+            allowable_codes=(200,),
+            cache_control=True,
+            ignored_parameters=_SECRET_PARAMS
+        )
+    else:
+        session = requests.Session()
+    
+    # Retry-After is ignored so a 429 backs off briefly instead of outlasting
+    # the function timeout
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=False
+    )
+    # One pool per API host; update-all runs up to two calls per pair at once
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Shared across warm invocations so connections (and TLS sessions) are reused
+_SESSION = _build_session()
+
+
+def _json(response):
+    """Parse a JSON response body straight from its bytes"""
+    return orjson.loads(response.content)
+
+
+def _utc_from_ms(values):
+    """Naive UTC datetimes for epoch-millisecond values, converted in one pass"""
+    # pandas is imported lazily, see _candle_frame
+    import pandas as pd
+    
+    return pd.to_datetime(values, unit='ms', cache=True).to_pydatetime()
+
+
+def _candle_frame(rows, columns, **to_datetime):
+    """
+    OHLCV DataFrame straight from API candle rows (lists or dicts)
+    columns: row fields, timestamp first; to_datetime: how to parse it
+    """
+    # pandas is only needed for frames, so the news function does not pay for
+    # importing it at cold start
+    import pandas as pd
+    
+    frame = pd.DataFrame(rows, columns=list(columns))
+    frame.rename(columns={columns[0]: 'timestamp'}, inplace=True)
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'], **to_datetime)
+    frame['volume'] = frame['volume'].fillna(0) if 'volume' in frame else 0.0
+    return frame
+
+
+def _parse_utc(value):
+    """Parse an ISO 8601 timestamp such as '2024-01-31T12:00:00Z' into naive UTC"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# Keywords tying a news article to each trading pair (substring matches)
+NEWS_KEYWORDS = {
+    'BTCUSDT': ('bitcoin', 'btc', 'satoshi'),
+    'ETHUSDT': ('ethereum', 'eth', 'vitalik', 'ether'),
+    'ETCUSDT': ('ethereum classic', 'etc'),
+    'SOLUSDT': ('solana', 'sol'),
+    'DOGEUSDT': ('dogecoin', 'doge', 'shiba'),
+    'EURUSD': ('euro', 'eur', 'ecb', 'european central bank', 'eurozone', 'lagarde'),
+    'GBPUSD': ('pound', 'sterling', 'gbp', 'uk', 'britain', 'bank of england', 'boe'),
+    'USDJPY': ('yen', 'jpy', 'japan', 'boj', 'bank of japan'),
+    'GBPJPY': ('pound yen', 'gbp/jpy', 'gbpjpy'),
+    'AUDUSD': ('aussie', 'aud', 'australia', 'rba', 'australian dollar'),
+    'USDCAD': ('loonie', 'cad', 'canada', 'boc', 'canadian dollar')
+}
+
+# General terms for articles that name no specific pair
+CRYPTO_NEWS_TERMS = (
+    'crypto', 'cryptocurrency', 'blockchain', 'digital currency', 'digital asset',
+    'altcoin', 'mining', 'defi', 'nft', 'web3', 'token', 'coin',
+    'binance', 'coinbase', 'exchange'
+)
+FOREX_NEWS_TERMS = (
+    'forex', 'currency', 'exchange rate', 'central bank', 'fed', 'federal reserve',
+    'interest rate', 'dollar', 'usd', 'inflation', 'gdp', 'employment',
+    'trade', 'monetary policy', 'rate hike', 'rate cut', 'treasury'
+)
+
+
+def _match_terms(terms):
+    """
+    The terms worth scanning for when any match will do: a term containing
+    another one (e.g. 'ethereum' contains 'eth') can never be the only match
+    """
+    return tuple(term for term in terms if not any(other != term and other in term for other in terms))
+
+
+_NEWS_MATCH_TERMS = {pair: _match_terms(terms) for pair, terms in NEWS_KEYWORDS.items()}
+_CRYPTO_MATCH_TERMS = _match_terms(CRYPTO_NEWS_TERMS)
+_FOREX_MATCH_TERMS = _match_terms(FOREX_NEWS_TERMS)
+
+# Sentiment keywords (substring matches, each counted once per article)
+POSITIVE_WORDS = (
+    'surge', 'rally', 'gain', 'rise', 'bullish', 'boom', 'growth',
+    'profit', 'positive', 'up', 'strong', 'optimistic', 'recovery',
+    'breakthrough', 'success', 'soar', 'jump', 'climb', 'advance'
+)
+NEGATIVE_WORDS = (
+    'crash', 'fall', 'drop', 'decline', 'bearish', 'loss', 'weak',
+    'negative', 'down', 'risk', 'concern', 'warning', 'crisis',
+    'plunge', 'tumble', 'slump', 'collapse', 'fear', 'uncertain'
+)
+
+# Sources whose articles get a credibility boost (substring of the source name)
+CREDIBLE_SOURCES = (
+    'reuters', 'bloomberg', 'financial times', 'wall street journal',
+    'cnbc', 'marketwatch', 'forbes', 'coindesk', 'cointelegraph',
+    'the economist', 'business insider', 'yahoo finance'
+)
+
 
 class DataFetcher:
     """Fetch data from multiple sources with rate limiting"""
     
-    def __init__(self):
+    def __init__(self, session=None):
+        # HTTP session, shared by default so every fetcher reuses one pool
+        self.session = session or _SESSION
+        
         # API Keys from environment variables
         self.alpha_vantage_key = os.environ.get('ALPHA_VANTAGE_KEY')
         self.polygon_key = os.environ.get('POLYGON_KEY')
         self.eodhd_key = os.environ.get('EODHD_KEY')
         self.newsapi_key = os.environ.get('NEWSAPI_KEY')
         
-        # Rate limiting trackers
-        self.last_call = {
-            'alpha_vantage': 0,
-            'polygon': 0,
-            'eodhd': 0
+        # Per-API rate limits (token buckets allow short bursts where the
+        # provider does)
+        self.limiters = {
+            'coingecko': TokenBucket(rate=1 / 2, capacity=2),  # 30 per minute (free tier)
+            'polygon': TokenBucket(rate=1 / 12, capacity=1),  # 5 per minute
+            'eodhd': TokenBucket(rate=1 / 5, capacity=3),
+            'alpha_vantage': TokenBucket(rate=1 / 13, capacity=1)  # 5 per minute
         }
         
-    def _rate_limit(self, api_name, min_interval):
-        """Enforce minimum time between API calls"""
-        elapsed = time.time() - self.last_call.get(api_name, 0)
-        if elapsed < min_interval:
-            time.sleep(min_interval - elapsed)
-        self.last_call[api_name] = time.time()
+        # Forex source order per pair, most recently successful first
+        self._forex_order = {}
+        self._forex_lock = threading.Lock()
+    
+    def close(self):
+        """Drop pooled connections (the session reconnects on the next call)"""
+        self.session.close()
     
     # ==================== CRYPTO DATA (Primary: CoinGecko) ====================
     
@@ -39,38 +222,49 @@ class DataFetcher:
         symbol: e.g., 'BTCUSDT', 'ETHUSDT'
         Returns: dict with current price data
         """
-        # Map trading symbols to CoinGecko IDs
-        coin_map = {
-            'BTCUSDT': 'bitcoin',
-            'ETHUSDT': 'ethereum',
-            'ETCUSDT': 'ethereum-classic',
-            'SOLUSDT': 'solana',
-            'DOGEUSDT': 'dogecoin'
-        }
+        return self.fetch_crypto_prices([symbol])[symbol]
+    
+    def fetch_crypto_prices(self, symbols):
+        """
+        Fetch prices for several cryptos with a single CoinGecko request
+        Returns: dict of symbol -> price data (None for coins without data)
+        """
+        unknown = [symbol for symbol in symbols if symbol not in COINGECKO_IDS]
+        if unknown:
+            raise ValueError(f"Unknown crypto symbol: {', '.join(unknown)}")
         
-        coin_id = coin_map.get(symbol)
-        if not coin_id:
-            raise ValueError(f"Unknown crypto symbol: {symbol}")
+        prices = dict.fromkeys(symbols)
+        if not symbols:
+            return prices
+        
+        self.limiters['coingecko'].acquire()
         
         try:
-            url = f"https://api.coingecko.com/api/v3/simple/price"
+            url = "https://api.coingecko.com/api/v3/simple/price"
             params = {
-                'ids': coin_id,
+                'ids': ','.join(COINGECKO_IDS[symbol] for symbol in symbols),
                 'vs_currencies': 'usd',
                 'include_24hr_change': 'true',
                 'include_24hr_vol': 'true'
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=(CONNECT_TIMEOUT, 10))
             response.raise_for_status()
             
-            data = response.json()
-            coin_data = data.get(coin_id, {})
+            data = _json(response)
+            
+        except Exception as e:
+            print(f"Error fetching {', '.join(symbols)}: {e}")
+            return prices
+        
+        for symbol in symbols:
+            coin_data = data.get(COINGECKO_IDS[symbol])
             
             if not coin_data:
-                raise ValueError(f"No data returned for {symbol}")
+                print(f"Error fetching {symbol}: No data returned for {symbol}")
+                continue
             
-            return {
+            prices[symbol] = {
                 'symbol': symbol,
                 'type': 'crypto',
                 'price': coin_data.get('usd', 0),
@@ -79,28 +273,21 @@ class DataFetcher:
                 'timestamp': datetime.utcnow(),
                 'source': 'coingecko'
             }
-            
-        except Exception as e:
-            print(f"Error fetching {symbol}: {e}")
-            return None
+        
+        return prices
     
-    def fetch_crypto_history(self, symbol, days=7):
+    def fetch_crypto_history(self, symbol, days=7, as_frame=False):
         """
         Fetch historical crypto data from CoinGecko
-        Returns: list of OHLCV dicts
+        Returns: list of OHLCV dicts, or with as_frame a DataFrame of OHLCV
+        columns for TechnicalAnalyzer (an empty list on failure either way)
         """
-        coin_map = {
-            'BTCUSDT': 'bitcoin',
-            'ETHUSDT': 'ethereum',
-            'ETCUSDT': 'ethereum-classic',
-            'SOLUSDT': 'solana',
-            'DOGEUSDT': 'dogecoin'
-        }
-        
-        coin_id = coin_map.get(symbol)
+        coin_id = COINGECKO_IDS.get(symbol)
         if not coin_id:
             return []
         
+        self.limiters['coingecko'].acquire()
+        
         try:
             url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/ohlc"
             params = {
@@ -108,17 +295,23 @@ class DataFetcher:
                 'days': days
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=(CONNECT_TIMEOUT, 15))
             response.raise_for_status()
             
-            data = response.json()
+            data = _json(response)
             
-            # Convert to standard OHLCV format
+            if as_frame:
+                # Rows are [timestamp_ms, open, high, low, close]
+                return _candle_frame(data, ('timestamp', 'open', 'high', 'low', 'close'), unit='ms')
+            
+            # Convert to standard OHLCV format, with every timestamp parsed
+            # in one vectorized pass
+            timestamps = _utc_from_ms([candle[0] for candle in data])
             history = []
-            for candle in data:
+            for timestamp, candle in zip(timestamps, data):
                 history.append({
                     'symbol': symbol,
-                    'timestamp': datetime.fromtimestamp(candle[0] / 1000),
+                    'timestamp': timestamp,
                     'open': candle[1],
                     'high': candle[2],
                     'low': candle[3],
@@ -142,7 +335,7 @@ class DataFetcher:
         if not self.polygon_key:
             return None
         
-        self._rate_limit('polygon', 12)  # 5 per minute = 12 sec spacing
+        self.limiters['polygon'].acquire()
         
         try:
             # Get previous day's close for comparison
@@ -154,10 +347,10 @@ class DataFetcher:
             url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/1/hour/{yesterday}/{yesterday}"
             params = {'apiKey': self.polygon_key}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=(CONNECT_TIMEOUT, 10))
             response.raise_for_status()
             
-            data = response.json()
+            data = _json(response)
             
             if data.get('resultsCount', 0) > 0:
                 results = data['results']
@@ -192,7 +385,7 @@ class DataFetcher:
         if not self.eodhd_key:
             return None
         
-        self._rate_limit('eodhd', 5)
+        self.limiters['eodhd'].acquire()
         
         try:
             # EODHD format: EURUSD.FOREX
@@ -201,10 +394,10 @@ class DataFetcher:
             url = f"https://eodhistoricaldata.com/api/real-time/{ticker}"
             params = {'api_token': self.eodhd_key, 'fmt': 'json'}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=(CONNECT_TIMEOUT, 10))
             response.raise_for_status()
             
-            data = response.json()
+            data = _json(response)
             
             if 'code' in data:
                 return {
@@ -231,7 +424,7 @@ class DataFetcher:
         if not self.alpha_vantage_key:
             return None
         
-        self._rate_limit('alpha_vantage', 13)  # 5 per minute
+        self.limiters['alpha_vantage'].acquire()
         
         try:
             from_currency = pair[:3]
@@ -245,10 +438,10 @@ class DataFetcher:
                 'apikey': self.alpha_vantage_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=(CONNECT_TIMEOUT, 10))
             response.raise_for_status()
             
-            data = response.json()
+            data = _json(response)
             
             if 'Realtime Currency Exchange Rate' in data:
                 rate_data = data['Realtime Currency Exchange Rate']
@@ -272,34 +465,67 @@ class DataFetcher:
     def fetch_forex_price(self, pair):
         """
         Fetch forex with fallback strategy
-        Priority: Polygon > EODHD > Alpha Vantage
+        Sources are tried in the order that last worked for this pair,
+        starting from Polygon > EODHD > Alpha Vantage
         """
-        # Try Polygon first (best for real-time)
-        data = self.fetch_forex_polygon(pair)
-        if data:
-            return data
-        
-        # Try EODHD
-        data = self.fetch_forex_eodhd(pair)
-        if data:
-            return data
-        
-        # Fallback to Alpha Vantage
-        data = self.fetch_forex_alphavantage(pair)
-        if data:
-            return data
-        
-        return None
+        with self._forex_lock:
+            order = self._forex_order.get(pair, FOREX_SOURCES)
+        
+        failed = []
+        for source in order:
+            data = getattr(self, f'fetch_forex_{source}')(pair)
+            if data:
+                break
+            failed.append(source)
+        else:
+            return None
+        
+        # The working source goes first next time, sources that just failed last
+        with self._forex_lock:
+            self._forex_order[pair] = (source,) + tuple(
+                other for other in order if other != source and other not in failed
+            ) + tuple(failed)
+        
+        return data
+    
+    # ==================== BATCHED PRICES ====================
     
-    def fetch_forex_history_eodhd(self, pair, days=7):
+    def fetch_price(self, symbol):
+        """Fetch the current price of any supported pair, None on failure"""
+        try:
+            if PAIR_TYPE.get(symbol) == 'crypto':
+                return self.fetch_crypto_price(symbol)
+            return self.fetch_forex_price(symbol)
+        except Exception as e:
+            print(f"Error fetching {symbol}: {e}")
+            return None
+    
+    def fetch_prices(self, symbols):
+        """
+        Fetch current prices for many pairs concurrently
+        Cryptos share one CoinGecko request; forex pairs are fetched in parallel
+        Returns: dict of symbol -> price data (None for pairs that failed)
+        """
+        crypto = [symbol for symbol in symbols if symbol in COINGECKO_IDS]
+        others = [symbol for symbol in symbols if symbol not in COINGECKO_IDS]
+        
+        with ThreadPoolExecutor(max_workers=len(others) + 1) as pool:
+            crypto_prices = pool.submit(self.fetch_crypto_prices, crypto)
+            prices = dict(zip(others, pool.map(self.fetch_price, others)))
+            prices.update(crypto_prices.result())
+        
+        return {symbol: prices[symbol] for symbol in symbols}
+    
+    def fetch_forex_history_eodhd(self, pair, days=7, as_frame=False):
         """
         Fetch historical forex data from EODHD
-        Returns: list of OHLCV dicts
+        Returns: list of OHLCV dicts, or with as_frame a DataFrame of OHLCV
+        columns for TechnicalAnalyzer (an empty list on failure either way)
         """
         if not self.eodhd_key:
             return []
         
-        self._rate_limit('eodhd', 5)
+        self.limiters['eodhd'].acquire()
         
         try:
             ticker = f"{pair}.FOREX"
@@ -315,16 +541,22 @@ class DataFetcher:
                 'fmt': 'json'
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=(CONNECT_TIMEOUT, 15))
             response.raise_for_status()
             
-            data = response.json()
+            data = _json(response)
+            
+            if as_frame:
+                return _candle_frame(
+                    data, ('date', 'open', 'high', 'low', 'close', 'volume'),
+                    format='%Y-%m-%d %H:%M:%S'
+                )
             
             history = []
             for candle in data:
                 history.append({
                     'symbol': pair,
-                    'timestamp': datetime.strptime(candle['date'], '%Y-%m-%d %H:%M:%S'),
+                    'timestamp': datetime.fromisoformat(candle['date']),
                     'open': candle['open'],
                     'high': candle['high'],
                     'low': candle['low'],
@@ -358,10 +590,10 @@ class DataFetcher:
                 'apiKey': self.newsapi_key
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=(CONNECT_TIMEOUT, 15))
             response.raise_for_status()
             
-            data = response.json()
+            data = _json(response)
             
             if data.get('status') == 'ok':
                 articles = []
@@ -371,9 +603,8 @@ class DataFetcher:
                         'description': article.get('description', ''),
                         'source': article.get('source', {}).get('name', 'Unknown'),
                         'url': article.get('url', ''),
-                        'published_at': datetime.strptime(
-                            article['publishedAt'], 
-                            '%Y-%m-%dT%H:%M:%SZ'
+                        'published_at': _parse_utc(
+                            article['publishedAt']
                         ) if article.get('publishedAt') else datetime.utcnow(),
                         'content': article.get('content', '')
                     })
@@ -395,52 +626,22 @@ class DataFetcher:
         
         relevant_pairs = []
         
-        # Specific keyword mapping (exact matches)
-        keywords = {
-            'BTCUSDT': ['bitcoin', 'btc', 'satoshi'],
-            'ETHUSDT': ['ethereum', 'eth', 'vitalik', 'ether'],
-            'ETCUSDT': ['ethereum classic', 'etc'],
-            'SOLUSDT': ['solana', 'sol'],
-            'DOGEUSDT': ['dogecoin', 'doge', 'shiba'],
-            'EURUSD': ['euro', 'eur', 'ecb', 'european central bank', 'eurozone', 'lagarde'],
-            'GBPUSD': ['pound', 'sterling', 'gbp', 'uk', 'britain', 'bank of england', 'boe'],
-            'USDJPY': ['yen', 'jpy', 'japan', 'boj', 'bank of japan'],
-            'GBPJPY': ['pound yen', 'gbp/jpy', 'gbpjpy'],
-            'AUDUSD': ['aussie', 'aud', 'australia', 'rba', 'australian dollar'],
-            'USDCAD': ['loonie', 'cad', 'canada', 'boc', 'canadian dollar']
-        }
-        
         # Check for specific pair keywords
-        for pair, terms in keywords.items():
-            if any(term in text for term in terms):
-                relevant_pairs.append(pair)
-        
-        # Remove duplicates while preserving order
-        relevant_pairs = list(dict.fromkeys(relevant_pairs))
+        for pair, terms in _NEWS_MATCH_TERMS.items():
+            for term in terms:
+                if term in text:
+                    relevant_pairs.append(pair)
+                    break
         
         # If no specific pairs found, check for general categories
         if not relevant_pairs:
-            # Crypto-related terms
-            crypto_terms = [
-                'crypto', 'cryptocurrency', 'blockchain', 'digital currency', 'digital asset',
-                'altcoin', 'mining', 'defi', 'nft', 'web3', 'token', 'coin',
-                'binance', 'coinbase', 'exchange'
-            ]
-            
-            # Forex-related terms
-            forex_terms = [
-                'forex', 'currency', 'exchange rate', 'central bank', 'fed', 'federal reserve',
-                'interest rate', 'dollar', 'usd', 'inflation', 'gdp', 'employment',
-                'trade', 'monetary policy', 'rate hike', 'rate cut', 'treasury'
-            ]
-            
             # Check for crypto relevance
-            if any(term in text for term in crypto_terms):
+            if any(term in text for term in _CRYPTO_MATCH_TERMS):
                 relevant_pairs = ['BTCUSDT', 'ETHUSDT']
                 print(f"General crypto article detected: {article.get('title', '')[:60]}")
             
             # Check for forex relevance
-            elif any(term in text for term in forex_terms):
+            elif any(term in text for term in _FOREX_MATCH_TERMS):
                 relevant_pairs = ['EURUSD', 'GBPUSD']
                 print(f"General forex article detected: {article.get('title', '')[:60]}")
         
@@ -453,20 +654,8 @@ class DataFetcher:
         """
         text = f"{article.get('title', '')} {article.get('description', '')}".lower()
         
-        positive_words = [
-            'surge', 'rally', 'gain', 'rise', 'bullish', 'boom', 'growth',
-            'profit', 'positive', 'up', 'strong', 'optimistic', 'recovery',
-            'breakthrough', 'success', 'soar', 'jump', 'climb', 'advance'
-        ]
-        
-        negative_words = [
-            'crash', 'fall', 'drop', 'decline', 'bearish', 'loss', 'weak',
-            'negative', 'down', 'risk', 'concern', 'warning', 'crisis',
-            'plunge', 'tumble', 'slump', 'collapse', 'fear', 'uncertain'
-        ]
-        
-        positive_count = sum(1 for word in positive_words if word in text)
-        negative_count = sum(1 for word in negative_words if word in text)
+        positive_count = sum(1 for word in POSITIVE_WORDS if word in text)
+        negative_count = sum(1 for word in NEGATIVE_WORDS if word in text)
         
         total = positive_count + negative_count
         
@@ -485,14 +674,8 @@ class DataFetcher:
         score = 5  # Base score
         
         # Source credibility boost
-        credible_sources = [
-            'reuters', 'bloomberg', 'financial times', 'wall street journal',
-            'cnbc', 'marketwatch', 'forbes', 'coindesk', 'cointelegraph',
-            'the economist', 'business insider', 'yahoo finance'
-        ]
-        
         source = article.get('source', '').lower()
-        if any(cs in source for cs in credible_sources):
+        if any(cs in source for cs in CREDIBLE_SOURCES):
             score += 2
         
         # Relevance boost
@@ -0,0 +1,266 @@
+"""
+Compiled Indicator Kernels
+Place in: /api/utils/indicators_numba.py
+"""
+import os
+import tempfile
+import numpy as np
+
+# The deployment bundle is read-only, so compiled kernels are cached in /tmp
+os.environ.setdefault('NUMBA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'numba_cache'))
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: run the kernels as plain Python"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Kernel argument type for price columns: any layout and read-only, so
+# strided slices and pandas' read-only views are accepted as they are
+VECTOR = "Array(float64, 1, 'A', readonly=True)"
+
+# Every kernel releases the GIL (nogil=True), so analyses running on
+# update-all's per-pair worker threads do not serialize on each other
+
+
+@njit('float64(float64, float64)', cache=True, nogil=True)
+def _nanmax(a, b):
+    """Larger of two values, ignoring NaN"""
+    if a != a:
+        return b
+    if b != b:
+        return a
+    return a if a > b else b
+
+
+@njit('UniTuple(float64, 2)(float64, float64, float64, float64)', cache=True, nogil=True)
+def _ewm_step(weighted, old_wt, cur, alpha):
+    """Advance an adjust=False EWM state (weighted value, old weight) by one value"""
+    is_observation = cur == cur
+    
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if is_observation:
+            if weighted != cur:
+                weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+            old_wt = 1.0
+    elif is_observation:
+        weighted = cur
+    
+    return weighted, old_wt
+
+
+@njit(f'float64({VECTOR}, int64)', cache=True, nogil=True)
+def ewm_last(values, span):
+    """
+    Exponentially weighted mean of the last element
+    Matches pandas ewm(span=span, adjust=False).mean().iloc[-1], including NaN gaps
+    """
+    n = values.shape[0]
+    if n == 0:
+        return np.nan
+    
+    alpha = 2.0 / (span + 1.0)
+    
+    weighted = values[0]
+    old_wt = 1.0
+    for i in range(1, n):
+        weighted, old_wt = _ewm_step(weighted, old_wt, values[i], alpha)
+    
+    return weighted
+
+
+@njit(f'UniTuple(float64, 2)({VECTOR}, int64, int64, int64)', cache=True, nogil=True)
+def macd_last(close, fast, slow, signal):
+    """
+    MACD line and signal line of the last bar
+    The fast and slow EMAs and the signal EWM of their difference advance
+    together, so no intermediate series is stored
+    """
+    n = close.shape[0]
+    if n == 0:
+        return np.nan, np.nan
+    
+    alpha_fast = 2.0 / (fast + 1.0)
+    alpha_slow = 2.0 / (slow + 1.0)
+    alpha_signal = 2.0 / (signal + 1.0)
+    
+    ema_fast, wt_fast = close[0], 1.0
+    ema_slow, wt_slow = close[0], 1.0
+    signal_line, wt_signal = ema_fast - ema_slow, 1.0
+    for i in range(1, n):
+        ema_fast, wt_fast = _ewm_step(ema_fast, wt_fast, close[i], alpha_fast)
+        ema_slow, wt_slow = _ewm_step(ema_slow, wt_slow, close[i], alpha_slow)
+        signal_line, wt_signal = _ewm_step(signal_line, wt_signal, ema_fast - ema_slow, alpha_signal)
+    
+    return ema_fast - ema_slow, signal_line
+
+
+@njit(f'float64({VECTOR}, int64)', cache=True, nogil=True)
+def rsi_last(close, period):
+    """
+    RSI of the last bar with Wilder's smoothing
+    Averages are seeded from the first period changes, then carried as
+    avg = (avg * (period - 1) + x) / period in a single pass
+    """
+    n = close.shape[0]
+    if n <= period:
+        return np.nan
+    
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        # Missing closes count as no change
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        
+        if i <= period:
+            avg_gain += gain / period
+            avg_loss += loss / period
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+    
+    # No losses: RSI is 100, or undefined if there were no gains either
+    if avg_loss == 0.0:
+        return 100.0 if avg_gain > 0.0 else np.nan
+    
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+@njit(f'float64({VECTOR}, {VECTOR}, {VECTOR}, int64)', cache=True, nogil=True)
+def atr_last(high, low, close, period):
+    """Average True Range of the last bar (simple average of the true range)"""
+    n = close.shape[0]
+    if n < period:
+        return np.nan
+    
+    total = 0.0
+    for i in range(n - period, n):
+        true_range = high[i] - low[i]
+        if i > 0:
+            prev_close = close[i - 1]
+            true_range = _nanmax(true_range, abs(high[i] - prev_close))
+            true_range = _nanmax(true_range, abs(low[i] - prev_close))
+        
+        if true_range != true_range:
+            return np.nan
+        total += true_range
+    
+    return total / period
+
+
+@njit(f'UniTuple(float64, 2)({VECTOR}, int64)', cache=True, nogil=True)
+def rolling_mean_std_last(values, period):
+    """Mean and sample standard deviation of the last period values"""
+    n = values.shape[0]
+    if n < period or period < 2:
+        return np.nan, np.nan
+    
+    total = 0.0
+    for i in range(n - period, n):
+        value = values[i]
+        if value != value:
+            return np.nan, np.nan
+        total += value
+    mean = total / period
+    
+    squares = 0.0
+    for i in range(n - period, n):
+        diff = values[i] - mean
+        squares += diff * diff
+    
+    return mean, np.sqrt(squares / (period - 1))
+
+
+@njit(f'UniTuple(float64, 2)({VECTOR}, {VECTOR}, float64, int64)', cache=True, nogil=True)
+def nearest_levels(low, high, price, lookback):
+    """
+    Nearest support and resistance over the last lookback bars
+    Support is the highest local-minimum low below price, resistance the
+    lowest local-maximum high above it; NaN when there is none
+    """
+    n = low.shape[0]
+    start = max(n - lookback, 0)
+    
+    support = np.nan
+    resistance = np.nan
+    for i in range(start + 1, n - 1):
+        value = low[i]
+        if value < low[i - 1] and value < low[i + 1] and value < price:
+            if support != support or value > support:
+                support = value
+        
+        value = high[i]
+        if value > high[i - 1] and value > high[i + 1] and value > price:
+            if resistance != resistance or value < resistance:
+                resistance = value
+    
+    return support, resistance
+
+
+@njit(f'UniTuple(float64, 8)({VECTOR}, {VECTOR}, {VECTOR})', cache=True, nogil=True)
+def default_indicators(high, low, close):
+    """
+    Last-bar values of every indicator at its default parameters in one pass
+    Returns (rsi, macd, macd_signal, ema_20, ema_50, bb_mean, bb_std, atr)
+    with RSI 14, MACD (12, 26, 9), Bollinger 20 and ATR 14
+    """
+    n = close.shape[0]
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan
+    
+    alpha_12 = 2.0 / 13.0
+    alpha_26 = 2.0 / 27.0
+    alpha_9 = 2.0 / 10.0
+    alpha_20 = 2.0 / 21.0
+    alpha_50 = 2.0 / 51.0
+    
+    first = close[0]
+    ema_12, wt_12 = first, 1.0
+    ema_26, wt_26 = first, 1.0
+    ema_20, wt_20 = first, 1.0
+    ema_50, wt_50 = first, 1.0
+    signal, wt_9 = ema_12 - ema_26, 1.0
+    
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        cur = close[i]
+        ema_12, wt_12 = _ewm_step(ema_12, wt_12, cur, alpha_12)
+        ema_26, wt_26 = _ewm_step(ema_26, wt_26, cur, alpha_26)
+        ema_20, wt_20 = _ewm_step(ema_20, wt_20, cur, alpha_20)
+        ema_50, wt_50 = _ewm_step(ema_50, wt_50, cur, alpha_50)
+        signal, wt_9 = _ewm_step(signal, wt_9, ema_12 - ema_26, alpha_9)
+        
+        # Wilder RSI, as in rsi_last
+        delta = cur - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if i <= 14:
+            avg_gain += gain / 14
+            avg_loss += loss / 14
+        else:
+            avg_gain = (avg_gain * 13 + gain) / 14
+            avg_loss = (avg_loss * 13 + loss) / 14
+    
+    if n <= 14:
+        rsi = np.nan
+    elif avg_loss == 0.0:
+        rsi = 100.0 if avg_gain > 0.0 else np.nan
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    
+    # Bollinger and ATR only look at the trailing window
+    bb_mean, bb_std = rolling_mean_std_last(close, 20)
+    atr = atr_last(high, low, close, 14)
+    
+    return rsi, ema_12 - ema_26, signal, ema_20, ema_50, bb_mean, bb_std, atr
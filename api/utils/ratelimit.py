@@ -0,0 +1,35 @@
+"""
+API Rate Limiting
+Place in: /api/utils/ratelimit.py
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: bursts up to capacity, then rate calls per second"""
+    
+    def __init__(self, rate, capacity=1):
+        """
+        rate: tokens added per second
+        capacity: most tokens held at once (the largest burst allowed)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping until it is available"""
+        # Reserve the token under the lock (the balance may go negative,
+        # queueing later callers behind it), then sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,18 @@
+"""
+HTTP Response Helpers
+Place in: /api/utils/responses.py
+"""
+
+
+def header_block(headers):
+    """Encode (name, value) header pairs once into raw header lines"""
+    return b''.join(f'{name}: {value}\r\n'.encode('latin-1') for name, value in headers)
+
+
+def send_header_block(handler, block):
+    """
+    Queue pre-encoded header lines on a BaseHTTPRequestHandler
+    Call after send_response, like send_header
+    """
+    if handler.request_version != 'HTTP/0.9':
+        handler._headers_buffer.append(block)
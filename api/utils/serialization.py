@@ -0,0 +1,71 @@
+"""
+JSON Serialization Helpers
+Place in: /api/utils/serialization.py
+"""
+import math
+import orjson
+
+# Stored timestamps are naive UTC, emit them as ISO 8601 with a Z suffix.
+# numpy scalars/arrays from the indicator code are serialized natively, and
+# non-str dict keys are stringified instead of raising
+_DUMPS_OPTIONS = (
+    orjson.OPT_NAIVE_UTC
+    | orjson.OPT_UTC_Z
+    | orjson.OPT_SERIALIZE_NUMPY
+    | orjson.OPT_NON_STR_KEYS
+)
+
+
+def dumps(data):
+    """
+    Serialize data to JSON bytes
+    Unknown types (e.g. ObjectId) fall back to str(), NaN/inf become null
+    """
+    return orjson.dumps(data, default=str, option=_DUMPS_OPTIONS)
+
+
+def dumps_array(items):
+    """
+    Serialize items one at a time into a JSON array that can be embedded in
+    data passed to dumps, so only one decoded item is held at a time
+    """
+    return orjson.Fragment(b'[' + b','.join(dumps(item) for item in items) + b']')
+
+
+def clean_nan_values(obj):
+    """
+    Replace NaN and inf floats with 0.0 in nested dicts/lists, in place
+    Used before analyses are stored, so reads can serialize documents as-is.
+    Returns obj (or the cleaned value when obj is a bare float)
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else 0.0
+    
+    # Walk containers with an explicit stack instead of recursing
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        
+        if isinstance(current, dict):
+            items = current.items()
+        elif isinstance(current, list):
+            items = enumerate(current)
+        else:
+            continue
+        
+        for key, value in items:
+            if isinstance(value, float):
+                if not math.isfinite(value):
+                    current[key] = 0.0
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    
+    return obj
+
+
+def loads(data):
+    """
+    Parse JSON from the raw request body bytes
+    An empty body parses as an empty object
+    """
+    return orjson.loads(data or b'{}')
@@ -5,7 +5,34 @@ Place in: /api/utils/technical.py
 import numpy as np
 import pandas as pd
 import math
+import threading
+from collections import OrderedDict, namedtuple
+from functools import cached_property
 from datetime import datetime, timedelta
+from indicators_numba import (
+    ewm_last, macd_last, rsi_last, atr_last, rolling_mean_std_last, nearest_levels, default_indicators
+)
+
+# Numeric candle fields, stored as float64 columns
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Raw last-bar values returned by the fused default_indicators kernel
+DefaultIndicators = namedtuple(
+    'DefaultIndicators',
+    'rsi macd macd_signal ema_20 ema_50 bb_middle bb_std atr'
+)
+
+# Indicator blocks from recent analyses, keyed by a fingerprint of the history
+_INDICATOR_CACHE = OrderedDict()
+_INDICATOR_CACHE_SIZE = 256
+_INDICATOR_CACHE_LOCK = threading.Lock()
+
+# Fixed part of the analysis stored when a pair has too little history
+_INSUFFICIENT_DATA_SIGNAL = {
+    'direction': 'INSUFFICIENT_DATA',
+    'confidence': 0,
+    'risk_reward': 2.0
+}
 
 
 def safe_float(value, default=0.0):
@@ -21,6 +48,13 @@ def safe_float(value, default=0.0):
         return default
 
 
+def _column(price_history, field):
+    """Yield one candle field for every row, missing values as NaN"""
+    for candle in price_history:
+        value = candle.get(field)
+        yield np.nan if value is None else value
+
+
 class TechnicalAnalyzer:
     """Calculate real technical indicators from price history"""
     
@@ -29,40 +63,143 @@ class TechnicalAnalyzer:
         Initialize with price history from MongoDB
         price_history: list of dicts with keys: timestamp, open, high, low, close, volume
         """
-        if not price_history or len(price_history) < 14:
+        if price_history is None or len(price_history) < 14:
             raise ValueError("Insufficient price data for analysis (need at least 14 periods)")
         
-        # Convert to DataFrame for easier manipulation
-        self.df = pd.DataFrame(price_history)
-        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
-        self.df.sort_values('timestamp', inplace=True)
-        self.df.reset_index(drop=True, inplace=True)
+        if isinstance(price_history, pd.DataFrame):
+            # Already columnar (the fetchers' as_frame histories)
+            columns = {
+                field: price_history[field].to_numpy(dtype=np.float64)
+                for field in OHLCV_FIELDS
+            }
+            timestamps = price_history['timestamp']
+            if not pd.api.types.is_datetime64_any_dtype(timestamps):
+                timestamps = pd.to_datetime(timestamps)
+            timestamps = pd.DatetimeIndex(timestamps)
+        else:
+            # Build contiguous float64 columns straight from the rows so no
+            # dtype has to be inferred for every field of every row
+            n = len(price_history)
+            columns = {
+                field: np.fromiter(_column(price_history, field), dtype=np.float64, count=n)
+                for field in OHLCV_FIELDS
+            }
+            timestamps = [candle['timestamp'] for candle in price_history]
+            # MongoDB and the fetchers hand back datetimes, which need no
+            # format inference
+            if not isinstance(timestamps[0], (datetime, np.datetime64)):
+                timestamps = pd.to_datetime(timestamps)
+            timestamps = pd.DatetimeIndex(timestamps)
+        
+        self._load(columns, timestamps)
+    
+    @classmethod
+    def from_arrays(cls, close, high=None, low=None, open=None, volume=None, timestamps=None, presorted=True):
+        """
+        Build an analyzer straight from aligned numpy columns, skipping the
+        per-row conversion. Missing high/low/open default to close and a
+        missing volume to NaN. With presorted=False the columns are ordered
+        by timestamps first.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        if close.shape[0] < 14:
+            raise ValueError("Insufficient price data for analysis (need at least 14 periods)")
         
+        columns = {
+            'open': close if open is None else np.asarray(open, dtype=np.float64),
+            'high': close if high is None else np.asarray(high, dtype=np.float64),
+            'low': close if low is None else np.asarray(low, dtype=np.float64),
+            'close': close,
+            'volume': np.full(close.shape[0], np.nan) if volume is None else np.asarray(volume, dtype=np.float64)
+        }
+        if timestamps is not None:
+            timestamps = pd.DatetimeIndex(timestamps)
+        elif not presorted:
+            raise ValueError("timestamps are required to sort the columns")
+        
+        analyzer = cls.__new__(cls)
+        analyzer._load(columns, timestamps, presorted)
+        return analyzer
+    
+    def _load(self, columns, timestamps, presorted=False):
+        """Store the float64 columns, sorting them into time order when needed"""
+        # Fetcher and database histories already arrive in time order, so
+        # only sort when needed
+        if not presorted and not timestamps.is_monotonic_increasing:
+            order = np.argsort(timestamps.asi8, kind='stable')
+            timestamps = timestamps[order]
+            columns = {field: values[order] for field, values in columns.items()}
+        
+        self.timestamps = timestamps
+        
+        # Sorted float64 arrays every indicator works on
+        self.open = columns['open']
+        self.high = columns['high']
+        self.low = columns['low']
+        self.close = columns['close']
+        self.volume = columns['volume']
+        self.last_close = safe_float(self.close[-1], 0.0)
+    
+    @cached_property
+    def df(self):
+        """The sorted history as a DataFrame, built only when asked for"""
+        columns = {field: getattr(self, field) for field in OHLCV_FIELDS}
+        if self.timestamps is not None:
+            columns['timestamp'] = self.timestamps
+        return pd.DataFrame(columns)
+    
+    # Indicators at their default parameters, computed once per analyzer
+    
+    @cached_property
+    def _defaults(self):
+        """Raw last-bar values of every default indicator from one kernel pass"""
+        return DefaultIndicators(*default_indicators(self.high, self.low, self.close))
+    
+    @cached_property
+    def rsi(self):
+        """RSI over 14 periods"""
+        return safe_float(self._defaults.rsi, 50.0)
+    
+    @cached_property
+    def macd(self):
+        """MACD (12, 26, 9)"""
+        return self._macd_result(self._defaults.macd, self._defaults.macd_signal)
+    
+    @cached_property
+    def bollinger_bands(self):
+        """Bollinger Bands (20, 2)"""
+        return self._bollinger_result(self._defaults.bb_middle, self._defaults.bb_std, 2)
+    
+    @cached_property
+    def atr(self):
+        """ATR over 14 periods"""
+        return safe_float(self._defaults.atr, 0.0001)
+    
+    @cached_property
+    def ema_20(self):
+        """20-period EMA"""
+        return safe_float(self._defaults.ema_20, self.last_close)
+    
+    @cached_property
+    def ema_50(self):
+        """50-period EMA"""
+        return safe_float(self._defaults.ema_50, self.last_close)
+    
     def calculate_rsi(self, period=14):
         """Calculate Relative Strength Index"""
-        delta = self.df['close'].diff()
-        
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        result = rsi.iloc[-1]
+        result = rsi_last(self.close, period)
         return safe_float(result, 50.0)
     
     def calculate_macd(self, fast=12, slow=26, signal=9):
         """Calculate MACD (Moving Average Convergence Divergence)"""
-        exp1 = self.df['close'].ewm(span=fast, adjust=False).mean()
-        exp2 = self.df['close'].ewm(span=slow, adjust=False).mean()
-        
-        macd_line = exp1 - exp2
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-        histogram = macd_line - signal_line
-        
-        macd_val = safe_float(macd_line.iloc[-1], 0.0)
-        signal_val = safe_float(signal_line.iloc[-1], 0.0)
-        hist_val = safe_float(histogram.iloc[-1], 0.0)
+        macd, signal_line = macd_last(self.close, fast, slow, signal)
+        return self._macd_result(macd, signal_line)
+    
+    def _macd_result(self, macd, signal):
+        """Format the last MACD and signal values"""
+        macd_val = safe_float(macd, 0.0)
+        signal_val = safe_float(signal, 0.0)
+        hist_val = safe_float(macd - signal, 0.0)
         
         return {
             'macd': round(macd_val, 6),
@@ -73,17 +210,19 @@ class TechnicalAnalyzer:
     
     def calculate_bollinger_bands(self, period=20, std_dev=2):
         """Calculate Bollinger Bands"""
-        sma = self.df['close'].rolling(window=period).mean()
-        std = self.df['close'].rolling(window=period).std()
-        
+        sma, std = rolling_mean_std_last(self.close, period)
+        return self._bollinger_result(sma, std, std_dev)
+    
+    def _bollinger_result(self, sma, std, std_dev):
+        """Format the bands around the last window's mean and standard deviation"""
         upper = sma + (std * std_dev)
         lower = sma - (std * std_dev)
         
-        current_price = safe_float(self.df['close'].iloc[-1], 0.0)
+        current_price = self.last_close
         
-        upper_val = safe_float(upper.iloc[-1], current_price * 1.02)
-        middle_val = safe_float(sma.iloc[-1], current_price)
-        lower_val = safe_float(lower.iloc[-1], current_price * 0.98)
+        upper_val = safe_float(upper, current_price * 1.02)
+        middle_val = safe_float(sma, current_price)
+        lower_val = safe_float(lower, current_price * 0.98)
         
         return {
             'upper': round(upper_val, 6),
@@ -103,48 +242,20 @@ class TechnicalAnalyzer:
     
     def calculate_atr(self, period=14):
         """Calculate Average True Range (for volatility and SL/TP)"""
-        high = self.df['high']
-        low = self.df['low']
-        close = self.df['close'].shift(1)
-        
-        tr1 = high - low
-        tr2 = abs(high - close)
-        tr3 = abs(low - close)
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-        
-        result = atr.iloc[-1]
+        result = atr_last(self.high, self.low, self.close, period)
         return safe_float(result, 0.0001)
     
     def find_support_resistance(self, lookback=50):
         """
         Find support and resistance levels using local minima/maxima
         """
-        if len(self.df) < lookback:
-            lookback = len(self.df)
-        
-        recent_data = self.df.tail(lookback)
-        
-        # Find local minima (support)
-        support_levels = []
-        for i in range(1, len(recent_data) - 1):
-            if (recent_data['low'].iloc[i] < recent_data['low'].iloc[i-1] and 
-                recent_data['low'].iloc[i] < recent_data['low'].iloc[i+1]):
-                support_levels.append(recent_data['low'].iloc[i])
+        if len(self.close) < lookback:
+            lookback = len(self.close)
         
-        # Find local maxima (resistance)
-        resistance_levels = []
-        for i in range(1, len(recent_data) - 1):
-            if (recent_data['high'].iloc[i] > recent_data['high'].iloc[i-1] and 
-                recent_data['high'].iloc[i] > recent_data['high'].iloc[i+1]):
-                resistance_levels.append(recent_data['high'].iloc[i])
+        current_price = self.last_close
         
-        current_price = safe_float(self.df['close'].iloc[-1], 0.0)
-        
-        # Get nearest support and resistance
-        support = max([s for s in support_levels if s < current_price], default=current_price * 0.97)
-        resistance = min([r for r in resistance_levels if r > current_price], default=current_price * 1.03)
+        # Nearest local minimum below and local maximum above the price
+        support, resistance = nearest_levels(self.low, self.high, current_price, lookback)
         
         return {
             'support': round(safe_float(support, current_price * 0.97), 6),
@@ -153,19 +264,17 @@ class TechnicalAnalyzer:
     
     def calculate_ema(self, period=20):
         """Calculate Exponential Moving Average"""
-        ema = self.df['close'].ewm(span=period, adjust=False).mean()
-        result = ema.iloc[-1]
-        fallback = safe_float(self.df['close'].iloc[-1], 0.0)
-        return safe_float(result, fallback)
+        result = ewm_last(self.close, period)
+        return safe_float(result, self.last_close)
     
     def get_trend(self):
         """Determine overall trend using multiple EMAs"""
-        if len(self.df) < 50:
+        if len(self.close) < 50:
             return 'insufficient_data'
         
-        ema_20 = self.calculate_ema(20)
-        ema_50 = self.calculate_ema(50)
-        current_price = safe_float(self.df['close'].iloc[-1], 0.0)
+        ema_20 = self.ema_20
+        ema_50 = self.ema_50
+        current_price = self.last_close
         
         # Strong uptrend
         if current_price > ema_20 > ema_50:
@@ -184,8 +293,11 @@ class TechnicalAnalyzer:
     
     def calculate_volume_analysis(self):
         """Analyze volume patterns"""
-        avg_volume = self.df['volume'].tail(20).mean()
-        current_volume = self.df['volume'].iloc[-1]
+        # Average of the last 20 volumes, skipping missing ones
+        recent = self.volume[-20:]
+        recent = recent[~np.isnan(recent)]
+        avg_volume = recent.mean() if recent.size else np.nan
+        current_volume = self.volume[-1]
         
         avg_volume = safe_float(avg_volume, 1.0)
         current_volume = safe_float(current_volume, 1.0)
@@ -202,11 +314,12 @@ class TechnicalAnalyzer:
     
     def get_price_change(self, periods=24):
         """Calculate price change over specified periods"""
-        if len(self.df) < periods:
-            periods = len(self.df) - 1
+        # Clamp to the oldest close (periods + 1 closes are needed)
+        if len(self.close) <= periods:
+            periods = len(self.close) - 1
         
-        current = safe_float(self.df['close'].iloc[-1], 0.0)
-        previous = safe_float(self.df['close'].iloc[-(periods + 1)], current)
+        current = self.last_close
+        previous = safe_float(self.close[-(periods + 1)], current)
         
         if previous == 0:
             return 0.0
@@ -214,6 +327,18 @@ class TechnicalAnalyzer:
         change = ((current - previous) / previous) * 100
         
         return safe_float(change, 0.0)
+    
+    def analyze(self):
+        """Every indicator used for signal generation, at default parameters"""
+        return {
+            'rsi': self.rsi,
+            'macd': self.macd,
+            'bollinger_bands': self.bollinger_bands,
+            'atr': self.atr,
+            'support_resistance': self.find_support_resistance(),
+            'trend': self.get_trend(),
+            'volume': self.calculate_volume_analysis()
+        }
 
 
 class SignalGenerator:
@@ -227,6 +352,17 @@ class SignalGenerator:
         """
         self.tech = technical_data
         self.price = safe_float(current_price, 0.0)
+        
+        # Clean the numeric inputs once so the signal rules can compare
+        # plain floats
+        macd = technical_data.get('macd', {})
+        sr = technical_data.get('support_resistance', {})
+        self.rsi = safe_float(technical_data.get('rsi', 50.0), 50.0)
+        self.atr = safe_float(technical_data.get('atr', 0.0001), 0.0001)
+        self.macd_trend = macd.get('trend')
+        self.macd_histogram = safe_float(macd.get('histogram', 0), 0)
+        self.support = safe_float(sr.get('support', self.price * 0.97), self.price * 0.97)
+        self.resistance = safe_float(sr.get('resistance', self.price * 1.03), self.price * 1.03)
     
     def calculate_position_size(self, account_risk=5, account_balance=100, lot_size=0.01):
         """
@@ -235,10 +371,8 @@ class SignalGenerator:
         For forex: 0.01 lot = 1000 units
         For crypto: Using USDT value directly
         """
-        atr = safe_float(self.tech.get('atr', 0.0001), 0.0001)
-        
         # Stop loss at 1.5 x ATR (reasonable for 4hr timeframe)
-        sl_distance = atr * 1.5
+        sl_distance = self.atr * 1.5
         
         # Risk-reward ratio of 2:1 minimum
         tp_distance = sl_distance * 2.5
@@ -258,7 +392,7 @@ class SignalGenerator:
         confidence_factors = []
         
         # RSI Signal
-        rsi = safe_float(self.tech.get('rsi', 50.0), 50.0)
+        rsi = self.rsi
         if rsi < 30:
             signals.append('LONG')
             confidence_factors.append(25)
@@ -269,11 +403,10 @@ class SignalGenerator:
             confidence_factors.append(10)
         
         # MACD Signal
-        macd = self.tech.get('macd', {})
-        if macd.get('trend') == 'bullish' and safe_float(macd.get('histogram', 0), 0) > 0:
+        if self.macd_trend == 'bullish' and self.macd_histogram > 0:
             signals.append('LONG')
             confidence_factors.append(20)
-        elif macd.get('trend') == 'bearish' and safe_float(macd.get('histogram', 0), 0) < 0:
+        elif self.macd_trend == 'bearish' and self.macd_histogram < 0:
             signals.append('SHORT')
             confidence_factors.append(20)
         
@@ -287,14 +420,10 @@ class SignalGenerator:
             confidence_factors.append(15)
         
         # Support/Resistance
-        sr = self.tech.get('support_resistance', {})
-        support = safe_float(sr.get('support', self.price * 0.97), self.price * 0.97)
-        resistance = safe_float(sr.get('resistance', self.price * 1.03), self.price * 1.03)
-        
-        if self.price <= support * 1.01:
+        if self.price <= self.support * 1.01:
             signals.append('LONG')
             confidence_factors.append(20)
-        elif self.price >= resistance * 0.99:
+        elif self.price >= self.resistance * 0.99:
             signals.append('SHORT')
             confidence_factors.append(20)
         
@@ -337,16 +466,89 @@ class SignalGenerator:
             sl = entry - position['sl_distance']
             tp = entry + position['tp_distance']
         
-        sl_dist = safe_float(position['sl_distance'], 0.0001)
-        tp_dist = safe_float(position['tp_distance'], 0.0001)
+        # The distances are already cleaned and rounded floats
+        sl_dist = position['sl_distance']
+        tp_dist = position['tp_distance']
         risk_reward = tp_dist / sl_dist if sl_dist > 0 else 2.5
         
         return {
             'direction': direction,
-            'confidence': round(safe_float(confidence, 0.0), 1),
-            'entry': round(safe_float(entry, 0.0), 6),
+            'confidence': round(float(confidence), 1),
+            'entry': round(entry, 6),
             'tp': round(safe_float(tp, 0.0), 6),
             'sl': round(safe_float(sl, 0.0), 6),
             'risk_reward': round(safe_float(risk_reward, 2.5), 2),
-            'atr': safe_float(self.tech.get('atr', 0.0001), 0.0001)
+            'atr': self.atr
         }
+
+
+def insufficient_data_analysis(symbol, pair_type, price_data):
+    """
+    Basic analysis for a pair without enough history for indicators
+    Prices come straight from the fetchers as finite floats, so the result
+    needs no NaN cleaning
+    """
+    price = price_data['price']
+    
+    return {
+        'symbol': symbol,
+        'type': pair_type,
+        'price': price,
+        'change_24h': price_data.get('change_24h', 0),
+        'volume': price_data.get('volume', 0),
+        'technical': None,
+        'signal': {
+            **_INSUFFICIENT_DATA_SIGNAL,
+            'entry': price,
+            'tp': price * 1.02,
+            'sl': price * 0.98
+        },
+        'timestamp': datetime.utcnow()
+    }
+
+
+def _history_key(symbol, price_history):
+    """Fingerprint a price history by its last timestamp, length and candle values"""
+    if isinstance(price_history, pd.DataFrame):
+        values = price_history[list(OHLCV_FIELDS)].to_numpy(dtype=np.float64)
+        last_timestamp = price_history['timestamp'].iloc[-1]
+        return (symbol, last_timestamp, len(price_history), hash(values.tobytes()))
+    
+    digest = hash(tuple(
+        tuple(candle.get(field) for field in OHLCV_FIELDS)
+        for candle in price_history
+    ))
+    return (symbol, price_history[-1]['timestamp'], len(price_history), digest)
+
+
+def _copy_technical(technical_data):
+    """Copy of an indicator block, down to its nested indicator dicts"""
+    return {
+        name: dict(value) if isinstance(value, dict) else value
+        for name, value in technical_data.items()
+    }
+
+
+def compute_technical_data(symbol, price_history):
+    """
+    Calculate every indicator used for signal generation
+    Results are memoized, so repeated polls against an unchanged history
+    skip the calculations entirely. Callers get their own copy, so the
+    in-place clean_nan_values cannot touch the memoized block.
+    """
+    key = _history_key(symbol, price_history)
+    
+    with _INDICATOR_CACHE_LOCK:
+        technical_data = _INDICATOR_CACHE.get(key)
+        if technical_data is not None:
+            _INDICATOR_CACHE.move_to_end(key)
+            return _copy_technical(technical_data)
+    
+    technical_data = TechnicalAnalyzer(price_history).analyze()
+    
+    with _INDICATOR_CACHE_LOCK:
+        _INDICATOR_CACHE[key] = technical_data
+        if len(_INDICATOR_CACHE) > _INDICATOR_CACHE_SIZE:
+            _INDICATOR_CACHE.popitem(last=False)
+    
+    return _copy_technical(technical_data)